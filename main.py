@@ -17,15 +17,12 @@ Optional environment variables:
 
 import asyncio
 import sys
-from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent / "src"))
-
-from src.cli.bot import main
+from src.cli.bot import install_uvloop, main
 
 
 if __name__ == "__main__":
+    install_uvloop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
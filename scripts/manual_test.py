@@ -6,13 +6,51 @@ This script provides guided manual testing procedures to verify
 the bot is working correctly in a real Telegram environment.
 """
 
+import functools
+import io
 import json
 import os
+import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+AUDIO_SUFFIXES = ('-audio.ogg', '-audio.mp3', '-audio.m4a', '-audio.wav')
+AUDIO_EXTENSIONS = ('.ogg', '.mp3', '.m4a', '.wav')
+
+# Longest list of offending file names printed by a single check
+MAX_LISTED_NAMES = 5
+
+# Filename fragments and metadata keys that would indicate stored PII
+PII_NAME_RE = re.compile(r'username|name|user|first|last|@', re.IGNORECASE)
+# First characters of every PII_NAME_RE alternative; names without any can't match
+PII_TRIGGER_CHARS = frozenset('nuflNUFL@')
+PII_FIELDS = frozenset({'username', 'first_name', 'last_name', 'phone_number', 'email'})
+
+
+def buffered_report(func):
+    """Collect a report function's output and write it to stdout in one call."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with redirect_stdout(buf):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+    return wrapper
+
 
 def print_header(title):
     """Print a formatted header."""
@@ -78,7 +116,74 @@ def get_bot_info():
     print(f"Allowlist: {allowlist}")
 
 
-def test_text_messages():
+def _scan_archive(root):
+    """Walk the storage tree once and bucket files by extension.
+
+    Returns a dict mapping 'text', 'audio', 'json' and 'other' to lists of
+    (path, size, mtime) tuples, using the stat data cached on each DirEntry.
+    Buckets go by extension only, so misnamed files still reach the naming
+    and metadata checks.
+    """
+    archive = {'text': [], 'audio': [], 'json': [], 'other': []}
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                name = entry.name
+                if name.endswith('.txt'):
+                    bucket = 'text'
+                elif name.endswith(AUDIO_EXTENSIONS):
+                    bucket = 'audio'
+                elif name.endswith('.json'):
+                    bucket = 'json'
+                else:
+                    bucket = 'other'
+                st = entry.stat()
+                archive[bucket].append((entry.path, st.st_size, st.st_mtime))
+    return archive
+
+
+def _numbered_subdirs(path, width):
+    """Return DirEntry objects for subdirectories named by a `width`-digit number."""
+    try:
+        with os.scandir(path) as it:
+            return [
+                e for e in it
+                if len(e.name) == width and e.name.isdigit() and e.is_dir()
+            ]
+    except OSError:
+        return []
+
+
+@functools.lru_cache(maxsize=4096)
+def _load_meta(path_str, mtime_ns):
+    """Parse a metadata file; keyed on mtime so a rewritten file is re-read."""
+    try:
+        with open(path_str, 'rb') as f:
+            return _json_loads(f.read())
+    except (ValueError, OSError):
+        return None
+
+
+def _load_json(path):
+    """Load a metadata JSON file, returning None if it cannot be read."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    return _load_meta(os.fspath(path), mtime_ns)
+
+
+def test_text_messages(today_dir):
     """Guide user through text message testing."""
     print_step(1, "Text Message Testing")
     
@@ -92,37 +197,38 @@ def test_text_messages():
     wait_for_input("Complete the above steps, then press Enter...")
     
     # Check for recent files
-    storage_dir = Path(os.getenv('STORAGE_DIR'))
-    now = datetime.now()
-    today_dir = storage_dir / f"{now.year:04d}" / f"{now.month:02d}" / f"{now.day:02d}"
-    
     if not today_dir.exists():
         print("❌ No files found for today. Check if messages were processed.")
         return False
     
-    text_files = list(today_dir.glob("*-text.txt"))
-    json_files = list(today_dir.glob("*-text.json"))
+    with os.scandir(today_dir) as it:
+        entries = list(it)
+    text_files = [e for e in entries if e.name.endswith('-text.txt')]
+    json_files = [e for e in entries if e.name.endswith('-text.json')]
     
     print(f"\nFound {len(text_files)} text files and {len(json_files)} metadata files")
     
     if text_files:
         print("✓ Text files created successfully")
         # Show content of most recent file
-        latest_file = max(text_files, key=lambda f: f.stat().st_mtime)
+        # DirEntry caches its stat result, so each candidate is stat'ed once
+        latest_file = Path(max(text_files, key=lambda e: e.stat().st_mtime).path)
         print(f"\nMost recent text file: {latest_file.name}")
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            content = f.read()[:100] + ('...' if len(f.read()) > 100 else '')
-            print(f"Content preview: {content}")
+        # Read one character past the preview length to know whether to add an ellipsis
+        with open(latest_file, 'r', encoding='utf-8', errors='replace') as f:
+            head = f.read(101)
+        content = head[:100] + ('...' if len(head) > 100 else '')
+        print(f"Content preview: {content}")
         
         # Show metadata
+        # A missing or unreadable sidecar simply yields None; no separate exists() stat
         meta_file = latest_file.with_suffix('.json')
-        if meta_file.exists():
+        metadata = _load_json(meta_file)
+        if metadata is not None:
             print(f"\nMetadata file: {meta_file.name}")
-            with open(meta_file, 'r') as f:
-                metadata = json.load(f)
-                print("Metadata keys:", list(metadata.keys()))
-                print(f"Size: {metadata.get('size')} bytes")
-                print(f"Checksum: {metadata.get('checksum', 'N/A')[:16]}...")
+            print("Metadata keys:", list(metadata.keys()))
+            print(f"Size: {metadata.get('size')} bytes")
+            print(f"Checksum: {metadata.get('checksum', 'N/A')[:16]}...")
     else:
         print("❌ No text files found. Check bot logs for errors.")
         return False
@@ -130,7 +236,7 @@ def test_text_messages():
     return True
 
 
-def test_voice_messages():
+def test_voice_messages(today_dir):
     """Guide user through voice message testing."""
     print_step(2, "Voice Message Testing")
     
@@ -144,36 +250,34 @@ def test_voice_messages():
     wait_for_input("Complete the above steps, then press Enter...")
     
     # Check for recent audio files
-    storage_dir = Path(os.getenv('STORAGE_DIR'))
-    now = datetime.now()
-    today_dir = storage_dir / f"{now.year:04d}" / f"{now.month:02d}" / f"{now.day:02d}"
-    
-    audio_extensions = ['*.ogg', '*.mp3', '*.m4a', '*.wav']
-    audio_files = []
-    for pattern in audio_extensions:
-        audio_files.extend(today_dir.glob(f"*-audio.{pattern[2:]}"))
+    if not today_dir.exists():
+        print("❌ No files found for today. Check if messages were processed.")
+        return False
     
-    audio_json_files = list(today_dir.glob("*-audio.json"))
+    with os.scandir(today_dir) as it:
+        entries = list(it)
+    audio_files = [e for e in entries if e.name.endswith(AUDIO_SUFFIXES)]
+    audio_json_files = [e for e in entries if e.name.endswith('-audio.json')]
     
     print(f"\nFound {len(audio_files)} audio files and {len(audio_json_files)} metadata files")
     
     if audio_files:
         print("✓ Audio files created successfully")
         # Show info about most recent file
-        latest_file = max(audio_files, key=lambda f: f.stat().st_mtime)
-        print(f"\nMost recent audio file: {latest_file.name}")
-        print(f"File size: {latest_file.stat().st_size} bytes")
+        # DirEntry caches its stat result, so each candidate is stat'ed once
+        latest_entry = max(audio_files, key=lambda e: e.stat().st_mtime)
+        print(f"\nMost recent audio file: {latest_entry.name}")
+        print(f"File size: {latest_entry.stat().st_size} bytes")
         
         # Show metadata
-        meta_file = latest_file.with_suffix('.json')
-        if meta_file.exists():
+        meta_file = Path(latest_entry.path).with_suffix('.json')
+        metadata = _load_json(meta_file)
+        if metadata is not None:
             print(f"\nMetadata file: {meta_file.name}")
-            with open(meta_file, 'r') as f:
-                metadata = json.load(f)
-                print("Metadata keys:", list(metadata.keys()))
-                print(f"Duration: {metadata.get('duration', 'N/A')} seconds")
-                print(f"MIME type: {metadata.get('mime_type', 'N/A')}")
-                print(f"Checksum: {metadata.get('checksum', 'N/A')[:16]}...")
+            print("Metadata keys:", list(metadata.keys()))
+            print(f"Duration: {metadata.get('duration', 'N/A')} seconds")
+            print(f"MIME type: {metadata.get('mime_type', 'N/A')}")
+            print(f"Checksum: {metadata.get('checksum', 'N/A')[:16]}...")
     else:
         print("❌ No audio files found. Check bot logs for errors.")
         return False
@@ -235,59 +339,62 @@ def test_health_command():
         return False
 
 
-def verify_file_structure():
+@buffered_report
+def verify_file_structure(storage_dir, today_dir, archive):
     """Verify the file structure and organization."""
     print_step(5, "File Structure Verification")
     
-    storage_dir = Path(os.getenv('STORAGE_DIR'))
-    now = datetime.now()
-    
     print("Checking file organization...")
     
     # Check date hierarchy
-    year_dirs = list(storage_dir.glob("[0-9][0-9][0-9][0-9]"))
+    year_dirs = _numbered_subdirs(storage_dir, 4)
     if year_dirs:
         print(f"✓ Found {len(year_dirs)} year directories")
         
         for year_dir in year_dirs:
-            month_dirs = list(year_dir.glob("[0-9][0-9]"))
+            month_dirs = _numbered_subdirs(year_dir.path, 2)
             print(f"  {year_dir.name}/: {len(month_dirs)} month directories")
             
             for month_dir in month_dirs[:3]:  # Show first 3 months
-                day_dirs = list(month_dir.glob("[0-9][0-9]"))
+                day_dirs = _numbered_subdirs(month_dir.path, 2)
                 print(f"    {month_dir.name}/: {len(day_dirs)} day directories")
     else:
         print("❌ No date-based directories found")
         return False
     
     # Check filename patterns
-    today_dir = storage_dir / f"{now.year:04d}" / f"{now.month:02d}" / f"{now.day:02d}"
     if today_dir.exists():
-        all_files = list(today_dir.glob("*"))
-        text_files = [f for f in all_files if f.suffix == '.txt']
-        audio_files = [f for f in all_files if f.suffix in ['.ogg', '.mp3', '.m4a', '.wav']]
-        json_files = [f for f in all_files if f.suffix == '.json']
+        today = str(today_dir)
+        text_files = [f for f in archive['text'] if os.path.dirname(f[0]) == today]
+        audio_files = [f for f in archive['audio'] if os.path.dirname(f[0]) == today]
+        json_files = [f for f in archive['json'] if os.path.dirname(f[0]) == today]
         
         print(f"\nToday's files ({today_dir.name}):")
         print(f"  Text files: {len(text_files)}")
         print(f"  Audio files: {len(audio_files)}")
         print(f"  Metadata files: {len(json_files)}")
         
-        # Verify filename pattern
-        for file in (text_files + audio_files)[:3]:  # Check first 3 files
-            parts = file.stem.split('-')
+        # Verify filename pattern (every file; the first 3 are listed)
+        invalid_names = []
+        for i, (path, _, _) in enumerate(text_files + audio_files):
+            name = os.path.basename(path)
+            parts = os.path.splitext(name)[0].split('-')
             if len(parts) >= 4:
-                timestamp, chat_id, msg_id, msg_type = parts[:4]
-                print(f"  ✓ {file.name}: valid pattern")
+                if i < 3:
+                    print(f"  ✓ {name}: valid pattern")
             else:
-                print(f"  ❌ {file.name}: invalid pattern")
+                invalid_names.append(name)
+        for name in invalid_names[:MAX_LISTED_NAMES]:
+            print(f"  ❌ {name}: invalid pattern")
+        if len(invalid_names) > MAX_LISTED_NAMES:
+            print(f"  ❌ ... and {len(invalid_names) - MAX_LISTED_NAMES} more files with invalid names")
         
         # Check metadata consistency
-        orphaned_files = []
-        for content_file in text_files + audio_files:
-            meta_file = content_file.with_suffix('.json')
-            if not meta_file.exists():
-                orphaned_files.append(content_file)
+        json_paths = {path for path, _, _ in json_files}
+        orphaned_files = [
+            path for path, _, _ in text_files + audio_files
+            if os.path.splitext(path)[0] + '.json' not in json_paths
+        ]
         
         if orphaned_files:
             print(f"❌ Found {len(orphaned_files)} files without metadata")
@@ -297,46 +404,47 @@ def verify_file_structure():
     return True
 
 
-def check_constitutional_compliance():
+@buffered_report
+def check_constitutional_compliance(archive):
     """Verify constitutional compliance in stored data."""
     print_step(6, "Constitutional Compliance Check")
     
     print("Checking privacy and security compliance...")
     
-    storage_dir = Path(os.getenv('STORAGE_DIR'))
-    
     # Check that no personal information is in filenames
-    personal_indicators = ['username', 'name', 'user', 'first', 'last', '@']
     problematic_files = []
     
-    for file_path in storage_dir.rglob("*"):
-        if file_path.is_file():
-            filename = file_path.name.lower()
-            for indicator in personal_indicators:
-                if indicator in filename:
-                    problematic_files.append((file_path, indicator))
+    for files in archive.values():
+        for path, _, _ in files:
+            name = os.path.basename(path)
+            if PII_TRIGGER_CHARS.isdisjoint(name):
+                continue
+            match = PII_NAME_RE.search(name)
+            if match:
+                problematic_files.append((path, match.group(0).lower()))
     
     if problematic_files:
         print(f"❌ Found {len(problematic_files)} files with potential PII in filenames:")
-        for file_path, indicator in problematic_files[:5]:  # Show first 5
-            print(f"  {file_path.name} (contains: {indicator})")
+        for path, indicator in problematic_files[:5]:  # Show first 5
+            print(f"  {os.path.basename(path)} (contains: {indicator})")
     else:
         print("✓ No personal information detected in filenames")
     
     # Check metadata files for PII
-    json_files = list(storage_dir.rglob("*.json"))
-    pii_fields = ['username', 'first_name', 'last_name', 'phone_number', 'email']
+    json_files = [path for path, _, _ in archive['json'][:10]]  # Check first 10 metadata files
+    
+    # Reads are blocking I/O, so overlap them on a small thread pool
+    loaded = []
+    if json_files:
+        with ThreadPoolExecutor(max_workers=min(32, len(json_files))) as executor:
+            loaded = list(executor.map(_load_json, json_files))
     
     pii_violations = []
-    for json_file in json_files[:10]:  # Check first 10 metadata files
-        try:
-            with open(json_file, 'r') as f:
-                metadata = json.load(f)
-                for field in pii_fields:
-                    if field in metadata:
-                        pii_violations.append((json_file, field))
-        except (json.JSONDecodeError, OSError):
+    for json_file, metadata in zip(json_files, loaded):
+        if not isinstance(metadata, dict):
             continue
+        for field in metadata.keys() & PII_FIELDS:
+            pii_violations.append((json_file, field))
     
     if pii_violations:
         print(f"❌ Found PII in {len(pii_violations)} metadata files")
@@ -347,35 +455,41 @@ def check_constitutional_compliance():
     required_fields = ['timestamp', 'message_id', 'chat_id', 'size', 'checksum']
     
     if json_files:
-        sample_file = json_files[0]
-        try:
-            with open(sample_file, 'r') as f:
-                metadata = json.load(f)
-                missing_fields = [field for field in required_fields if field not in metadata]
-                if missing_fields:
-                    print(f"❌ Missing required metadata fields: {missing_fields}")
-                else:
-                    print("✓ All required metadata fields present")
-        except (json.JSONDecodeError, OSError):
+        # Reuse the sample already loaded above instead of reading it again
+        metadata = loaded[0]
+        if metadata is None:
             print("❌ Could not read sample metadata file")
+        else:
+            missing_fields = [field for field in required_fields if field not in metadata]
+            if missing_fields:
+                print(f"❌ Missing required metadata fields: {missing_fields}")
+            else:
+                print("✓ All required metadata fields present")
     
     return len(problematic_files) == 0 and len(pii_violations) == 0
 
 
-def generate_test_report():
+@buffered_report
+def generate_test_report(archive):
     """Generate a summary test report."""
     print_header("TEST REPORT SUMMARY")
     
-    storage_dir = Path(os.getenv('STORAGE_DIR'))
-    
-    # Count files
-    text_files = list(storage_dir.rglob("*-text.txt"))
-    audio_files = []
-    for ext in ['ogg', 'mp3', 'm4a', 'wav']:
-        audio_files.extend(storage_dir.rglob(f"*-audio.{ext}"))
-    json_files = list(storage_dir.rglob("*.json"))
-    
-    total_size = sum(f.stat().st_size for f in text_files + audio_files + json_files)
+    # Only properly named messages count as processed
+    text_files = [f for f in archive['text'] if f[0].endswith('-text.txt')]
+    audio_files = [f for f in archive['audio'] if f[0].endswith(AUDIO_SUFFIXES)]
+    json_files = archive['json']
+    
+    # Fold sizes and the activity range into one pass over the cached stats
+    total_size = 0
+    oldest_mtime = latest_mtime = None
+    for files, is_content in ((text_files, True), (audio_files, True), (json_files, False)):
+        for _, size, mtime in files:
+            total_size += size
+            if is_content:
+                if oldest_mtime is None or mtime < oldest_mtime:
+                    oldest_mtime = mtime
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest_mtime = mtime
     
     print(f"Files processed during testing:")
     print(f"  Text messages: {len(text_files)}")
@@ -384,18 +498,26 @@ def generate_test_report():
     print(f"  Total storage used: {total_size / (1024*1024):.2f} MB")
     
     # Show recent activity
-    if text_files or audio_files:
-        all_content_files = text_files + audio_files
-        latest_file = max(all_content_files, key=lambda f: f.stat().st_mtime)
-        oldest_file = min(all_content_files, key=lambda f: f.stat().st_mtime)
-        
+    if latest_mtime is not None:
         print(f"\nActivity range:")
-        print(f"  Oldest file: {datetime.fromtimestamp(oldest_file.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"  Latest file: {datetime.fromtimestamp(latest_file.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"  Oldest file: {datetime.fromtimestamp(oldest_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"  Latest file: {datetime.fromtimestamp(latest_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
     
     print(f"\nTesting completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
+def run_test(results, test_name, test_func, *args):
+    """Run a single test, recording its result."""
+    try:
+        results[test_name] = test_func(*args)
+    except KeyboardInterrupt:
+        print("\n\nTesting interrupted by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Test '{test_name}' failed with error: {e}")
+        results[test_name] = False
+
+
 def main():
     """Main testing workflow."""
     print_header("ArchiveDrop Manual Testing Script")
@@ -412,27 +534,31 @@ def main():
     
     wait_for_input("\nReady to start testing? Press Enter to continue...")
     
+    # Resolve the storage locations once for the whole session
+    storage_dir = Path(os.environ['STORAGE_DIR'])
+    today_dir = storage_dir / f"{datetime.now():%Y/%m/%d}"
+    
     # Run tests
     tests = [
-        ("Text Messages", test_text_messages),
-        ("Voice Messages", test_voice_messages),
+        ("Text Messages", test_text_messages, today_dir),
+        ("Voice Messages", test_voice_messages, today_dir),
         ("Rate Limiting", test_rate_limiting),
         ("Health Command", test_health_command),
-        ("File Structure", verify_file_structure),
-        ("Constitutional Compliance", check_constitutional_compliance),
     ]
     
     results = {}
     
-    for test_name, test_func in tests:
-        try:
-            results[test_name] = test_func()
-        except KeyboardInterrupt:
-            print("\n\nTesting interrupted by user.")
-            sys.exit(1)
-        except Exception as e:
-            print(f"\n❌ Test '{test_name}' failed with error: {e}")
-            results[test_name] = False
+    for test_name, test_func, *args in tests:
+        run_test(results, test_name, test_func, *args)
+    
+    # Walk the archive once and share it between the file checks and the report
+    archive = _scan_archive(storage_dir)
+    archive_checks = [
+        ("File Structure", verify_file_structure, storage_dir, today_dir, archive),
+        ("Constitutional Compliance", check_constitutional_compliance, archive),
+    ]
+    for test_name, test_func, *args in archive_checks:
+        run_test(results, test_name, test_func, *args)
     
     # Summary
     print_header("TESTING RESULTS")
@@ -451,7 +577,7 @@ def main():
     else:
         print(f"\n⚠️  {total - passed} test(s) failed. Review the output above and check your bot configuration.")
     
-    generate_test_report()
+    generate_test_report(archive)
 
 
 if __name__ == "__main__":
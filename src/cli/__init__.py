@@ -0,0 +1 @@
+"""Empty init file to make cli a Python package."""
\ No newline at end of file
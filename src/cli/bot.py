@@ -24,10 +24,14 @@ Implements constitutional requirements:
 """
 
 import asyncio
+import itertools
+import os
 import sys
+import time
+from collections import deque
 from datetime import datetime
-from io import BytesIO
 from pathlib import Path
+from typing import Deque, Dict, Optional
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
@@ -35,10 +39,10 @@ from aiogram.enums import ParseMode
 from aiogram.filters import Command, CommandStart
 from aiogram.types import Message
 
-from src.config import get_config
+from src.config import Config, get_config
 from src.lib.rate_limit import RateLimiter
 from src.lib.validation import validate_mime_and_ext, validate_size
-from src.services.storage import save_text, save_audio
+from src.services.storage import ensure_dir, retry_in_dir, save_text, save_audio_from_path
 from src.observability.logging import get_logger, log_event
 
 
@@ -48,10 +52,48 @@ rate_limiter = None
 bot = None
 dp = Dispatcher()
 
-# Health monitoring
-bot_start_time = None
-last_error_time = None
+# Configuration bound once in main(); handlers fall back to get_config() without it
+app_config: Optional[Config] = None
+storage_root: Optional[Path] = None
+
+# Fixed replies
+WELCOME_TEXT = (
+    "Вітаю! На зв'язку <a href='https://www.linkedin.com/in/shao3d/'>Андрій Сазонов</a>.\n\n"
+    "Вже скоро ми зустрінемося в <b>InnSaga Business Club</b>, щоб поговорити про AI. А поки — давайте разом зробимо майбутню розмову максимально корисною!\n\n"
+    "Цей бот створений, щоб почути саме вас. Поділіться, що вас як підприємця цікавить або турбує в темі штучного інтелекту? Які бізнес-процеси ви б хотіли оптимізувати за допомогою технологій?\n\n"
+    "Немає часу писати? Запишіть голосове — я буду вдячний за будь-який формат.\n\n"
+    "Ваші думки допоможуть сфокусувати нашу зустріч на реальних потребах бізнесу.\n\n"
+    "Чекаю на ваші коментарі. Дякую!"
+)
+RATE_LIMIT_TEXT = "⚠️ Rate limit exceeded. Please wait before sending more messages."
+BUSY_TEXT = "⏳ The bot is busy right now. Please try again in a moment."
+UNSUPPORTED_TEXT = "❌ Unsupported message type. Send text or voice messages only."
+PROCESSING_ERROR_TEXT = "❌ Sorry, I couldn't process your message. Please try again later."
+
+# Voice MIME type -> stored file extension
+MIME_EXTENSIONS = {
+    "audio/ogg": "ogg",
+    "audio/mpeg": "mp3",
+    "audio/mp4": "m4a",
+    "audio/x-m4a": "m4a"
+}
+
+# Background storage workers (started in main(); None means process inline)
+WORKER_COUNT = 8
+WORK_QUEUE_SIZE = 256
+WORKER_DRAIN_TIMEOUT = 30.0  # seconds to finish queued messages on shutdown
+work_queue: Optional[asyncio.Queue] = None
+# Chats a worker is currently processing -> their messages queued behind it.
+# Only owned chats have a backlog (at most WORKER_COUNT), so this cap keeps
+# backlogged work within WORK_QUEUE_SIZE as well.
+CHAT_BACKLOG_SIZE = WORK_QUEUE_SIZE // WORKER_COUNT
+chat_backlogs: Dict[int, Deque[tuple]] = {}
+
+# Health monitoring (time.monotonic() readings; wall clock is only used for storage)
+bot_start_time: Optional[float] = None
+last_error_time: Optional[float] = None
 session_stored_count = 0
+stored_counter = itertools.count(1)  # next() is a single atomic C call
 
 
 class BotError(Exception):
@@ -68,6 +110,40 @@ def init_bot() -> Bot:
     )
 
 
+def ensure_date_dir(storage_base: Path, timestamp: datetime) -> str:
+    """Create (once per process) and return the YYYY/MM/DD directory for a timestamp."""
+    date_dir = os.path.join(
+        os.fspath(storage_base), f"{timestamp.year:04d}", f"{timestamp.month:02d}", f"{timestamp.day:02d}"
+    )
+    ensure_dir(date_dir)
+    return date_dir
+
+
+def open_download_file(date_dir: str, chat_id: int, message_id: int) -> str:
+    """Create the empty temp file a voice note is downloaded into and return its path.
+
+    The name is hidden and tied to the message, so a leftover from a crashed
+    download is recognisable and is replaced when the message is retried.
+    Mode 0o666 lets the umask apply, so the archived file gets the same
+    permissions as text and JSON files (mkstemp would force 0o600).
+    """
+    tmp_name = os.path.join(date_dir, f".voice-{chat_id}-{message_id}.download")
+    try:
+        os.unlink(tmp_name)
+    except FileNotFoundError:
+        pass
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY
+    os.close(retry_in_dir(date_dir, lambda: os.open(tmp_name, flags, 0o666)))
+    return tmp_name
+
+
+def active_config() -> Config:
+    """Return the config bound at startup, loading it if the bot was not started via main()."""
+    if app_config is not None:
+        return app_config
+    return get_config()
+
+
 def init_rate_limiter() -> RateLimiter:
     """Initialize rate limiter with configuration."""
     config = get_config()
@@ -84,18 +160,9 @@ async def safe_answer(message: Message, text: str) -> None:
     - Logs both success and failure cases.
     - Handles both production and test environments.
     """
-    # Debug log to see what's happening
-    log_event(
-        logger=logger,
-        event="safe_answer_called",
-        message=f"safe_answer called, text='{text[:50]}...'",
-        chat_id=message.chat.id,
-        message_id=message.message_id
-    )
-    
     try:
         # Use message.bot to get the bot instance
-        result = await message.bot.send_message(chat_id=message.chat.id, text=text)
+        await message.bot.send_message(chat_id=message.chat.id, text=text)
         
         # Log successful message sending
         log_event(
@@ -133,15 +200,6 @@ async def handle_start(message: Message) -> None:
         message_id=message.message_id
     )
     
-    welcome_text = (
-        "Вітаю! На зв'язку <a href='https://www.linkedin.com/in/shao3d/'>Андрій Сазонов</a>.\n\n"
-        "Вже скоро ми зустрінемося в <b>InnSaga Business Club</b>, щоб поговорити про AI. А поки — давайте разом зробимо майбутню розмову максимально корисною!\n\n"
-        "Цей бот створений, щоб почути саме вас. Поділіться, що вас як підприємця цікавить або турбує в темі штучного інтелекту? Які бізнес-процеси ви б хотіли оптимізувати за допомогою технологій?\n\n"
-        "Немає часу писати? Запишіть голосове — я буду вдячний за будь-який формат.\n\n"
-        "Ваші думки допоможуть сфокусувати нашу зустріч на реальних потребах бізнесу.\n\n"
-        "Чекаю на ваші коментарі. Дякую!"
-    )
-    
     try:
         log_event(
             logger=logger,
@@ -151,7 +209,7 @@ async def handle_start(message: Message) -> None:
             message_id=message.message_id
         )
         
-        await safe_answer(message, welcome_text)
+        await safe_answer(message, WELCOME_TEXT)
         
         log_event(
             logger=logger,
@@ -175,8 +233,6 @@ async def handle_start(message: Message) -> None:
 @dp.message(Command("health"))
 async def handle_health(message: Message) -> None:
     """Handle /health command with detailed status."""
-    global bot_start_time, last_error_time, session_stored_count
-    
     chat_id = message.chat.id
     user_id = message.from_user.id if message.from_user else 0
     
@@ -188,7 +244,7 @@ async def handle_health(message: Message) -> None:
     # Check rate limiting first
     result = rate_limiter.is_allowed(user_id)
     if not result.allowed:
-        await safe_answer(message, "⚠️ Rate limit exceeded. Please wait before sending more messages.")
+        await safe_answer(message, RATE_LIMIT_TEXT)
         return
     
     log_event(
@@ -199,58 +255,55 @@ async def handle_health(message: Message) -> None:
         message_id=message.message_id
     )
     
-    config = get_config()
-    storage_dir = Path(config.storage_dir)
+    config = active_config()
+    storage_dir = config.storage_dir
     
     # Calculate uptime
     uptime = None
-    if bot_start_time:
-        uptime_seconds = int((datetime.utcnow() - bot_start_time).total_seconds())
-        uptime_hours = uptime_seconds // 3600
-        uptime_minutes = (uptime_seconds % 3600) // 60
-        uptime_seconds = uptime_seconds % 60
+    if bot_start_time is not None:
+        uptime_hours, remainder = divmod(int(time.monotonic() - bot_start_time), 3600)
+        uptime_minutes, uptime_seconds = divmod(remainder, 60)
         uptime = f"{uptime_hours:02d}:{uptime_minutes:02d}:{uptime_seconds:02d}"
     
     # Basic health checks
-    health_status = "🤖 <b>ArchiveDrop Health Status</b>\n\n"
-    health_status += "✅ Bot is running\n"
+    health_status = [
+        "🤖 <b>ArchiveDrop Health Status</b>\n\n",
+        "✅ Bot is running\n",
+    ]
     
     if storage_dir.exists() and storage_dir.is_dir():
-        health_status += "✅ Storage directory accessible\n"
-        try:
-            # Test write permissions
-            test_file = storage_dir / ".health_check"
-            test_file.touch()
-            test_file.unlink()
-            health_status += "✅ Storage directory writable\n"
-        except Exception:
-            health_status += "❌ Storage directory not writable\n"
+        health_status.append("✅ Storage directory accessible\n")
+        # Check write permission without creating a probe file
+        if os.access(storage_dir, os.W_OK):
+            health_status.append("✅ Storage directory writable\n")
+        else:
+            health_status.append("❌ Storage directory not writable\n")
     else:
-        health_status += "❌ Storage directory not accessible\n"
+        health_status.append("❌ Storage directory not accessible\n")
     
-    health_status += f"✅ Rate limiting active ({config.rate_limit_per_min}/min)\n"
-    health_status += f"✅ Max audio size: {config.max_audio_bytes:,} bytes\n"
+    health_status.append(f"✅ Rate limiting active ({config.rate_limit_per_min}/min)\n")
+    health_status.append(f"✅ Max audio size: {config.max_audio_bytes:,} bytes\n")
     
     # Add session statistics
-    health_status += f"\n📊 <b>Session Stats</b>\n"
+    health_status.append("\n📊 <b>Session Stats</b>\n")
     if uptime:
-        health_status += f"⏱️ Uptime: {uptime}\n"
-    health_status += f"📁 Messages stored: {session_stored_count}\n"
+        health_status.append(f"⏱️ Uptime: {uptime}\n")
+    health_status.append(f"📁 Messages stored: {session_stored_count}\n")
     
-    if last_error_time:
-        error_ago_seconds = int((datetime.utcnow() - last_error_time).total_seconds())
+    if last_error_time is not None:
+        error_ago_seconds = int(time.monotonic() - last_error_time)
         if error_ago_seconds < 60:
             error_ago = f"{error_ago_seconds}s ago"
         elif error_ago_seconds < 3600:
             error_ago = f"{error_ago_seconds // 60}m ago"
         else:
             error_ago = f"{error_ago_seconds // 3600}h ago"
-        health_status += f"⚠️ Last error: {error_ago}\n"
+        health_status.append(f"⚠️ Last error: {error_ago}\n")
     else:
-        health_status += f"✅ No errors this session\n"
+        health_status.append("✅ No errors this session\n")
     
     try:
-        await safe_answer(message, health_status)
+        await safe_answer(message, "".join(health_status))
     except Exception as e:
         log_event(
             logger=logger,
@@ -290,16 +343,25 @@ async def handle_message(message: Message) -> None:
         await safe_answer(message, f"⚠️ Rate limit exceeded. Try again after {result.reset_time.strftime('%H:%M:%S')} UTC.")
         return
     
-    config = get_config()
-    storage_base = Path(config.storage_dir)
-    # Ensure storage directory and today's subdirectory exist
+    # save_text and the voice download create today's directory themselves
+    storage_base = storage_root if storage_root is not None else active_config().storage_dir
+    
+    if work_queue is None:
+        await process_message(message, storage_base, timestamp)
+        return
+    
+    # Hand off downloads and disk writes so polling is not blocked by slow saves
     try:
-        storage_base.mkdir(parents=True, exist_ok=True)
-        date_dir = storage_base / f"{timestamp.year:04d}" / f"{timestamp.month:02d}" / f"{timestamp.day:02d}"
-        date_dir.mkdir(parents=True, exist_ok=True)
-    except Exception:
-        # If directory cannot be created, let underlying save_* raise a clearer error
-        pass
+        work_queue.put_nowait((message, storage_base, timestamp))
+    except asyncio.QueueFull:
+        await reject_busy(message)
+
+
+async def process_message(message: Message, storage_base: Path, timestamp: datetime) -> None:
+    """Store a text or voice message and report failures to the user."""
+    chat_id = message.chat.id
+    message_id = message.message_id
+    user_id = message.from_user.id if message.from_user else 0
     
     try:
         # Handle text messages (only if real string)
@@ -321,7 +383,7 @@ async def handle_message(message: Message) -> None:
                 message_id=message_id
             )
             
-            await safe_answer(message, "❌ Unsupported message type. Send text or voice messages only.")
+            await safe_answer(message, UNSUPPORTED_TEXT)
     
     except Exception as e:
         # Debug: Log detailed error information
@@ -343,7 +405,85 @@ async def handle_message(message: Message) -> None:
             status="error"
         )
         
-        await safe_answer(message, "❌ Sorry, I couldn't process your message. Please try again later.")
+        await safe_answer(message, PROCESSING_ERROR_TEXT)
+
+
+async def message_worker(queue: asyncio.Queue) -> None:
+    """Process queued messages, keeping messages from one chat in order.
+
+    The first worker to pick up a chat owns it until that chat's backlog is
+    empty; other workers append the chat's later messages to the backlog and
+    move on, so a busy chat occupies one worker instead of blocking all of them.
+    """
+    while True:
+        item = await queue.get()
+        chat_id = item[0].chat.id
+        backlog = chat_backlogs.get(chat_id)
+        if backlog is not None:
+            if len(backlog) >= CHAT_BACKLOG_SIZE:
+                await reject_busy(item[0])
+                queue.task_done()
+                continue
+            # The owning worker calls task_done() once it has processed this
+            backlog.append(item)
+            continue
+        backlog = chat_backlogs[chat_id] = deque()
+        try:
+            while True:
+                await process_queued_message(*item)
+                queue.task_done()
+                if not backlog:
+                    break
+                item = backlog.popleft()
+        finally:
+            del chat_backlogs[chat_id]
+
+
+async def reject_busy(message: Message) -> None:
+    """Tell the user their message was not accepted because the bot is saturated."""
+    user_id = message.from_user.id if message.from_user else 0
+    log_event(
+        logger=logger,
+        event="work_queue_full",
+        message=f"Work queue full, rejecting message from user {user_id}",
+        chat_id=message.chat.id,
+        message_id=message.message_id,
+        status="rejected"
+    )
+    await safe_answer(message, BUSY_TEXT)
+
+
+async def process_queued_message(message: Message, storage_base: Path, timestamp: datetime) -> None:
+    """process_message for a worker: errors are logged, never raised."""
+    try:
+        await process_message(message, storage_base, timestamp)
+    except Exception as e:
+        log_event(
+            logger=logger,
+            event="worker_error",
+            message=f"Unhandled error in message worker: {e}",
+            chat_id=message.chat.id,
+            message_id=message.message_id,
+            status="error"
+        )
+
+
+def pending_message_count(queue: asyncio.Queue) -> int:
+    """Accepted messages not yet picked up: in the queue or in a chat backlog."""
+    return queue.qsize() + sum(len(backlog) for backlog in chat_backlogs.values())
+
+
+async def drain_work_queue(queue: asyncio.Queue) -> None:
+    """Wait (up to WORKER_DRAIN_TIMEOUT) for already accepted messages to be stored."""
+    try:
+        await asyncio.wait_for(queue.join(), WORKER_DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        log_event(
+            logger=logger,
+            event="work_queue_drain_timeout",
+            message=f"Shutting down with {pending_message_count(queue)} queued messages unprocessed",
+            status="error"
+        )
 
 
 async def handle_text_message(message: Message, storage_base: Path, timestamp: datetime) -> None:
@@ -354,6 +494,8 @@ async def handle_text_message(message: Message, storage_base: Path, timestamp: d
     message_id = message.message_id
     user_id = message.from_user.id if message.from_user else 0
     text = message.text
+    text_bytes = text.encode('utf-8')
+    text_size = len(text_bytes)
 
     # Debug: Start of function
     log_event(
@@ -365,8 +507,9 @@ async def handle_text_message(message: Message, storage_base: Path, timestamp: d
     )
     
     try:
-        # Save text atomically
-        text_path, json_path = save_text(
+        # Save text atomically (off the event loop; fsync blocks)
+        text_path, json_path = await asyncio.to_thread(
+            save_text,
             base_dir=storage_base,
             chat_id=chat_id,
             message_id=message_id,
@@ -374,11 +517,12 @@ async def handle_text_message(message: Message, storage_base: Path, timestamp: d
             timestamp=timestamp,
             sender_id=user_id,
             include_sender_id=False,
-            include_size_alias=True
+            include_size_alias=True,
+            text_bytes=text_bytes
         )
         
         # Increment success counter
-        session_stored_count += 1
+        session_stored_count = next(stored_counter)
         
         log_event(
             logger=logger,
@@ -388,7 +532,7 @@ async def handle_text_message(message: Message, storage_base: Path, timestamp: d
             chat_id=chat_id,
             message_id=message_id,
             status="success",
-            size=len(text.encode('utf-8'))
+            size=text_size
         )
         
         # Debug: About to call safe_answer
@@ -401,10 +545,10 @@ async def handle_text_message(message: Message, storage_base: Path, timestamp: d
         )
         
         # Confirm to user (no sensitive content in response)
-        await safe_answer(message, f"✅ Text saved ({len(text.encode('utf-8'))} bytes)")
+        await safe_answer(message, f"✅ Text saved ({text_size} bytes)")
         
     except Exception as e:
-        last_error_time = datetime.utcnow()
+        last_error_time = time.monotonic()
         
         log_event(
             logger=logger,
@@ -414,7 +558,7 @@ async def handle_text_message(message: Message, storage_base: Path, timestamp: d
             chat_id=chat_id,
             message_id=message_id,
             status="error",
-            size=len(text.encode('utf-8'))
+            size=text_size
         )
         raise BotError(f"Text save failed: {e}")
 
@@ -437,54 +581,52 @@ async def handle_voice_message(message: Message, storage_base: Path, timestamp:
         file_size = voice.file_size
         
         # Get file extension from MIME type
-        extension_map = {
-            "audio/ogg": "ogg",
-            "audio/mpeg": "mp3", 
-            "audio/mp4": "m4a",
-            "audio/x-m4a": "m4a"
-        }
-        extension = extension_map.get(mime_type, "ogg")
+        extension = MIME_EXTENSIONS.get(mime_type, "ogg")
         
         # Validate MIME type and size
         validate_mime_and_ext(mime_type, extension)
-        config = get_config()
+        config = active_config()
         validate_size(file_size, config.max_audio_bytes)
         
-        # Download voice file
-        audio_bytes: bytes
+        # Stream the voice file to a temp file next to its final location
+        date_dir = ensure_date_dir(storage_base, timestamp)
+        tmp_name = open_download_file(date_dir, chat_id, message_id)
         try:
-            # Prefer simple API used in tests if available
-            data = await bot.download(voice.file_id)  # type: ignore[attr-defined]
+            try:
+                data = await bot.download(voice.file_id, destination=tmp_name)  # type: ignore[attr-defined]
+            except Exception:
+                # Fallback to get_file + download_file
+                voice_file = await bot.get_file(voice.file_id)
+                data = await bot.download_file(voice_file.file_path, tmp_name)
             if isinstance(data, (bytes, bytearray)):
-                audio_bytes = bytes(data)
-            elif hasattr(data, "read"):
-                # File-like object
-                audio_bytes = data.read()
-            else:
-                raise TypeError("Unsupported download return type")
-        except Exception:
-            # Fallback to get_file + download_file
-            voice_file = await bot.get_file(voice.file_id)
-            voice_data = BytesIO()
-            await bot.download_file(voice_file.file_path, voice_data)
-            audio_bytes = voice_data.getvalue()
-        
-        # Save audio atomically
-        audio_path, json_path = save_audio(
-            base_dir=storage_base,
-            chat_id=chat_id,
-            message_id=message_id,
-            audio_data=audio_bytes,
-            mime_type=mime_type,
-            extension=extension,
-            timestamp=timestamp,
-            sender_id=user_id,
-            duration=voice.duration if hasattr(voice, "duration") else None,
-            include_sender_id=False
-        )
+                # Test doubles return the payload instead of writing it
+                with open(tmp_name, "wb") as f:
+                    f.write(data)
+            audio_size = os.path.getsize(tmp_name)
+            
+            # Move into the archive atomically (off the event loop; hashing and fsync block)
+            audio_path, json_path = await asyncio.to_thread(
+                save_audio_from_path,
+                base_dir=storage_base,
+                chat_id=chat_id,
+                message_id=message_id,
+                source_path=Path(tmp_name),
+                mime_type=mime_type,
+                extension=extension,
+                timestamp=timestamp,
+                sender_id=user_id,
+                duration=voice.duration if hasattr(voice, "duration") else None,
+                include_sender_id=False
+            )
+        finally:
+            # Already renamed into the archive on success
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
         
         # Increment success counter
-        session_stored_count += 1
+        session_stored_count = next(stored_counter)
         
         log_event(
             logger=logger,
@@ -494,12 +636,12 @@ async def handle_voice_message(message: Message, storage_base: Path, timestamp:
             chat_id=chat_id,
             message_id=message_id,
             status="success",
-            size=len(audio_bytes)
+            size=audio_size
         )
         
         # Confirm to user
         duration_text = f"{voice.duration}s" if voice.duration else "unknown duration"
-        await safe_answer(message, f"✅ Voice saved ({len(audio_bytes)} bytes, {duration_text})")
+        await safe_answer(message, f"✅ Voice saved ({audio_size} bytes, {duration_text})")
         
     except ValueError as e:
         # Validation errors (user error)
@@ -516,7 +658,7 @@ async def handle_voice_message(message: Message, storage_base: Path, timestamp:
         
     except Exception as e:
         # System errors
-        last_error_time = datetime.utcnow()
+        last_error_time = time.monotonic()
         
         log_event(
             logger=logger,
@@ -530,27 +672,42 @@ async def handle_voice_message(message: Message, storage_base: Path, timestamp:
         raise BotError(f"Voice save failed: {e}")
 
 
+def install_uvloop() -> None:
+    """Use uvloop's event loop when it is installed (it is not available on Windows)."""
+    try:
+        import uvloop  # type: ignore[import-not-found]
+    except ImportError:
+        return
+    uvloop.install()
+
+
 async def main() -> None:
     """Main bot entry point."""
-    global bot, rate_limiter, bot_start_time
+    global bot, rate_limiter, bot_start_time, work_queue, app_config, storage_root
     
+    workers = []
     try:
         # Initialize components
         bot = init_bot()
         rate_limiter = init_rate_limiter()
-        bot_start_time = datetime.utcnow()
+        bot_start_time = time.monotonic()
         
-        config = get_config()
-        storage_dir = Path(config.storage_dir)
-        storage_dir.mkdir(parents=True, exist_ok=True)
+        app_config = get_config()
+        storage_root = app_config.storage_dir
+        storage_root.mkdir(parents=True, exist_ok=True)
         
         log_event(
             logger=logger,
             event="bot_starting",
-            message=f"ArchiveDrop bot starting, storage: {storage_dir}"
+            message=f"ArchiveDrop bot starting, storage: {storage_root}"
         )
         
-        # Start polling
+        # Start storage workers, then polling
+        work_queue = asyncio.Queue(maxsize=WORK_QUEUE_SIZE)
+        workers = [
+            asyncio.create_task(message_worker(work_queue))
+            for _ in range(WORKER_COUNT)
+        ]
         await dp.start_polling(bot)
         
     except Exception as e:
@@ -561,9 +718,17 @@ async def main() -> None:
             status="error"
         )
         sys.exit(1)
+    finally:
+        # Updates are already acknowledged to Telegram; store what was accepted
+        if work_queue is not None and workers:
+            await drain_work_queue(work_queue)
+        for worker in workers:
+            worker.cancel()
+        work_queue = None
 
 
 if __name__ == "__main__":
+    install_uvloop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
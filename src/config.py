@@ -8,9 +8,11 @@ Optional vars: RATE_LIMIT_PER_MIN, MAX_AUDIO_BYTES, ALLOWLIST, LOG_LEVEL
 
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import FrozenSet, Optional
 from dotenv import load_dotenv
 
+LOG_LEVELS = frozenset({"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"})
+
 
 class Config:
     """Configuration container with validation."""
@@ -30,10 +32,10 @@ class Config:
         
         # Parse allowlist (comma-separated user IDs)
         allowlist_str = os.getenv("ALLOWLIST", "")
-        self.allowlist: Optional[List[int]] = None
+        self.allowlist: Optional[FrozenSet[int]] = None
         if allowlist_str.strip():
             try:
-                self.allowlist = [int(uid.strip()) for uid in allowlist_str.split(",")]
+                self.allowlist = frozenset(int(uid.strip()) for uid in allowlist_str.split(","))
             except ValueError as e:
                 raise ValueError(f"Invalid ALLOWLIST format: {e}")
         
@@ -58,7 +60,7 @@ class Config:
         if self.max_audio_bytes < 1024:  # At least 1KB
             raise ValueError("MAX_AUDIO_BYTES must be at least 1024 bytes")
         
-        if self.log_level not in {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}:
+        if self.log_level not in LOG_LEVELS:
             raise ValueError(f"Invalid LOG_LEVEL: {self.log_level}")
     
     def is_user_allowed(self, user_id: int) -> bool:
@@ -10,12 +10,11 @@ Implements constitutional transparency requirements:
 
 JSON LOG SCHEMA (finalized):
 {
-    "timestamp": "2025-01-15T14:30:45,123",  // ISO format with milliseconds
+    "ts": "2025-01-15T14:30:45.123456+00:00",  // UTC ISO 8601 timestamp
     "level": "INFO|ERROR|WARNING|DEBUG",     // Python logging levels
-    "logger": "src.cli.bot",                 // Logger name (module path)
-    "message": "Human readable message",     // Brief description
     "event": "message_saved|rate_limit_exceeded|...",  // Event type (see EVENT_TYPES)
-    "message_type": "text|audio",            // Optional: type of Telegram message
+    "message": "Human readable message",     // Brief description
+    "type": "text|audio",                    // Optional: type of Telegram message
     "message_id": 12345,                     // Optional: Telegram message ID
     "chat_id": -1001234567890,              // Optional: Telegram chat ID
     "status": "success|error|rejected",      // Optional: operation result
@@ -42,40 +41,49 @@ PRIVACY COMPLIANCE:
 import json
 import logging
 import sys
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None  # type: ignore[assignment]
+
+
+def dumps_log(data: Dict[str, Any]) -> str:
+    """Serialize a log entry to compact UTF-8 JSON, using orjson when it is installed.
+
+    Both encoders produce the same line: no spaces after separators, non-ASCII
+    left unescaped, and non-string keys in details converted to strings.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, default=datetime.isoformat, separators=(",", ":"), ensure_ascii=False)
+
+
+# Structured fields copied from a LogRecord into the JSON output when set
+EXTRA_FIELDS = ("type", "message_id", "chat_id", "status", "details", "size", "checksum")
+
 
 class JSONFormatter(logging.Formatter):
-    """JSON log formatter with constitutional compliance."""
-    
+    """Custom formatter for structured JSON logs."""
+
     def format(self, record: logging.LogRecord) -> str:
-        """Format log record as JSON with required fields."""
-        log_data = {
-            "timestamp": self.formatTime(record),
+        log_entry: Dict[str, Any] = {
+            "ts": datetime.now(timezone.utc),
             "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage()
+            "event": getattr(record, "event", "unknown"),
+            "message": record.getMessage(),
         }
-        
-        # Add structured fields if present
-        if hasattr(record, "event"):
-            log_data["event"] = record.event
-        if hasattr(record, "message_type"):
-            log_data["message_type"] = record.message_type  
-        if hasattr(record, "message_id"):
-            log_data["message_id"] = record.message_id
-        if hasattr(record, "chat_id"):
-            log_data["chat_id"] = record.chat_id
-        if hasattr(record, "status"):
-            log_data["status"] = record.status
-        if hasattr(record, "size"):
-            log_data["size"] = record.size
-        if hasattr(record, "checksum"):
-            log_data["checksum"] = record.checksum
-        if hasattr(record, "details") and record.details:
-            log_data["details"] = record.details
-            
-        return json.dumps(log_data)
+
+        # Add optional fields if present
+        fields = record.__dict__
+        for field in EXTRA_FIELDS:
+            value = fields.get(field)
+            if value is not None:
+                log_entry[field] = value
+
+        return dumps_log(log_entry)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -113,16 +121,19 @@ def log_event(
     NEVER pass raw message text or audio content to this function.
     Use size/checksum for content references instead.
     """
-    # Create log record with extra fields
+    # Skip building the record when this level is filtered out
+    if not logger.isEnabledFor(level):
+        return
+    
     extra = {
         "event": event,
-        "message_type": message_type,
+        "type": message_type,
         "message_id": message_id,
         "chat_id": chat_id,
         "status": status,
         "details": details,
         "size": size,
-        "checksum": checksum
+        "checksum": checksum,
     }
     
     # Remove None values
@@ -212,80 +223,3 @@ def log_error_with_code(
         status="error",
         details=error_details
     )
-
-import json
-import logging
-import sys
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional
-
-
-class JSONFormatter(logging.Formatter):
-    """Custom formatter for structured JSON logs."""
-
-    def format(self, record: logging.LogRecord) -> str:
-        log_entry: Dict[str, Any] = {
-            "ts": datetime.now(timezone.utc).isoformat(),
-            "level": record.levelname,
-            "event": getattr(record, "event", "unknown"),
-            "message": record.getMessage(),
-        }
-
-        # Add optional fields if present
-        for field in ["type", "message_id", "chat_id", "status", "details", "size", "checksum"]:
-            if hasattr(record, field) and getattr(record, field) is not None:
-                log_entry[field] = getattr(record, field)
-
-        return json.dumps(log_entry)
-
-
-def get_logger(name: str) -> logging.Logger:
-    """Get a logger with JSON formatting."""
-    logger = logging.getLogger(name)
-    
-    # Only add handler if none exists (avoid duplicates)
-    if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(JSONFormatter())
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
-        logger.propagate = False
-    
-    return logger
-
-
-def log_event(
-    logger: logging.Logger,
-    event: str,
-    level: int = logging.INFO,
-    message: str = "",
-    *,
-    message_type: Optional[str] = None,
-    message_id: Optional[int] = None,
-    chat_id: Optional[int] = None,
-    status: Optional[str] = None,
-    details: Optional[Dict[str, Any]] = None,
-    size: Optional[int] = None,
-    checksum: Optional[str] = None,
-) -> None:
-    """
-    Log a structured event with consistent fields.
-    
-    NEVER pass raw message text or audio content to this function.
-    Use size/checksum for content references instead.
-    """
-    extra = {
-        "event": event,
-        "type": message_type,
-        "message_id": message_id,
-        "chat_id": chat_id,
-        "status": status,
-        "details": details,
-        "size": size,
-        "checksum": checksum,
-    }
-    
-    # Remove None values
-    extra = {k: v for k, v in extra.items() if v is not None}
-    
-    logger.log(level, message, extra=extra)
\ No newline at end of file
@@ -9,21 +9,193 @@ Implements constitutional requirements:
 - SHA256 checksums for integrity
 """
 
+import errno
 import hashlib
 import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Tuple, Optional
+from typing import Callable, Dict, Any, Set, Tuple, Optional, TypeVar
 
 from src.lib.naming import build_stem, build_paths
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None  # type: ignore[assignment]
+
+
+# Chunk size for fused hash + write passes over payloads
+WRITE_CHUNK_SIZE = 64 * 1024
+
+# Directories already created by this process (skips repeated mkdir syscalls)
+_created_dirs: Set[str] = set()
+
+# Synced payloads at least this large are dropped from the page cache; the bot never re-reads them
+DROP_CACHE_MIN_BYTES = 256 * 1024
+
+# fdatasync skips flushing unchanged inode metadata; not available on macOS/Windows
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+# Linux: stage writes in an unnamed inode, then link it in via /proc (no tmp name to clean up)
+_O_TMPFILE = getattr(os, "O_TMPFILE", None) if os.path.isdir("/proc/self/fd") else None
+
+# errno values meaning the filesystem can't do O_TMPFILE; fall back to a named tmp file
+_TMPFILE_UNSUPPORTED = frozenset({errno.EISDIR, errno.EOPNOTSUPP, errno.EINVAL})
+
+
+T = TypeVar("T")
+
 
 class StorageError(Exception):
     """Raised when storage operations fail."""
     pass
 
 
+def ensure_dir(directory: Any) -> None:
+    """Create directory (with parents) unless this process already created it.
+    
+    A cached directory that is removed later (cleanup, remounted volume) is
+    recreated by retry_in_dir() when a file can't be opened in it.
+    """
+    key = os.fspath(directory)
+    if key in _created_dirs:
+        return
+    os.makedirs(key, exist_ok=True)
+    if len(_created_dirs) >= 64:
+        # Date directories are only hot for a day; keep the set small
+        _created_dirs.clear()
+    _created_dirs.add(key)
+
+
+def retry_in_dir(directory: Any, func: Callable[[], T]) -> T:
+    """Call func(), which creates a file in directory; if the directory has
+    vanished since ensure_dir() cached it, create it again and retry once."""
+    try:
+        return func()
+    except FileNotFoundError:
+        _created_dirs.discard(os.fspath(directory))
+        ensure_dir(directory)
+        return func()
+
+
+def _write_atomic(path: Path, data: bytes, digest: Optional[Any] = None) -> None:
+    """Write data to path via tmp -> fdatasync -> replace, removing the tmp file on failure.
+    
+    On Linux the tmp file is an O_TMPFILE inode that only gets a name once it is
+    complete, so nothing partial is ever visible and nothing is left behind on
+    failure. Elsewhere a named "<path>.tmp" file is used.
+    
+    The rename is only durable once the parent directory is synced; callers
+    do that once per save with _fsync_dir().
+    
+    If digest (a hashlib object) is given, it is updated with each chunk as it is
+    written, so the payload is traversed once for both hashing and writing.
+    """
+    directory = os.path.dirname(os.fspath(path))
+    fd = retry_in_dir(directory, lambda: _open_tmpfile(directory))
+    if fd is not None:
+        with open(fd, "wb") as f:
+            _write_payload(f, data, digest)
+            _link_tmpfile(f.fileno(), path)
+        return
+    
+    tmp_path = os.fspath(path) + ".tmp"
+    try:
+        with retry_in_dir(directory, lambda: open(tmp_path, "wb")) as f:
+            _write_payload(f, data, digest)
+        
+        # Rename to final path (atomic on POSIX and Windows)
+        os.replace(tmp_path, path)
+        
+    except Exception:
+        _unlink_quietly(tmp_path)
+        raise
+
+
+def _write_payload(f: Any, data: bytes, digest: Optional[Any]) -> None:
+    """Write data to an open binary file (hashing chunk-wise if asked) and sync it."""
+    if digest is None:
+        f.write(data)
+    else:
+        view = memoryview(data)
+        for start in range(0, len(view), WRITE_CHUNK_SIZE):
+            chunk = view[start:start + WRITE_CHUNK_SIZE]
+            digest.update(chunk)
+            f.write(chunk)
+    f.flush()
+    _fdatasync(f.fileno())
+    _drop_page_cache(f.fileno(), len(data))
+
+
+def _open_tmpfile(directory: str) -> Optional[int]:
+    """Open an unnamed O_TMPFILE inode in directory, or None if unsupported there."""
+    if _O_TMPFILE is None:
+        return None
+    try:
+        # 0o666 so the final file respects umask, like a regular open()
+        return os.open(directory, _O_TMPFILE | os.O_WRONLY, 0o666)
+    except OSError as e:
+        if e.errno in _TMPFILE_UNSUPPORTED:
+            return None
+        raise
+
+
+def _link_tmpfile(fd: int, path: Path) -> None:
+    """Give an O_TMPFILE inode its final name, replacing any existing file."""
+    proc_path = f"/proc/self/fd/{fd}"
+    # Passing a dir fd makes os.link() use linkat(AT_SYMLINK_FOLLOW); plain link()
+    # would try to hard-link the /proc symlink itself. proc_path is absolute, so
+    # the dir fd is otherwise ignored.
+    try:
+        os.link(proc_path, path, src_dir_fd=fd, follow_symlinks=True)
+        return
+    except FileExistsError:
+        pass
+    
+    # link() won't overwrite; name it next to the target and rename over it
+    tmp_path = os.fspath(path) + ".tmp"
+    _unlink_quietly(tmp_path)
+    os.link(proc_path, tmp_path, src_dir_fd=fd, follow_symlinks=True)
+    try:
+        os.replace(tmp_path, path)
+    except Exception:
+        _unlink_quietly(tmp_path)
+        raise
+
+
+def _drop_page_cache(fd: int, size: int) -> None:
+    """Ask the kernel to evict a synced file's pages (Linux only; advisory)."""
+    if size >= DROP_CACHE_MIN_BYTES and hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _unlink_quietly(path: Any) -> None:
+    """Remove a file if it exists (one syscall, no separate exists() check)."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _dump_metadata(metadata: Dict[str, Any]) -> bytes:
+    """Serialize metadata to compact JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(metadata)
+    return json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Flush directory entries (renames) to disk. No-op where directories can't be opened."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
 def save_text(
     base_dir: Path,
     chat_id: int,
@@ -32,7 +204,8 @@ def save_text(
     timestamp: datetime,
     sender_id: Optional[int] = None,
     include_sender_id: bool = True,
-    include_size_alias: bool = False
+    include_size_alias: bool = False,
+    text_bytes: Optional[bytes] = None
 ) -> Tuple[Path, Path]:
     """
     Save text message atomically with metadata JSON.
@@ -44,6 +217,7 @@ def save_text(
         text: Message text content
         timestamp: UTC timestamp
         sender_id: Optional numeric sender ID (minimal PII)
+        text_bytes: Optional UTF-8 encoding of text, if the caller already has it
     
     Returns:
         Tuple of (text_file_path, metadata_json_path)
@@ -61,28 +235,19 @@ def save_text(
         text_path, json_path = build_paths(base_dir, date_parts, stem, "txt")
         
         # Create date directory if needed
-        text_path.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(text_path.parent)
         
-        # Encode text and compute checksum
-        text_bytes = text.encode("utf-8")
-        checksum = hashlib.sha256(text_bytes).hexdigest()
+        # Encode text (unless already encoded)
+        if text_bytes is None:
+            text_bytes = text.encode("utf-8")
         
-        # Atomic write: tmp -> fsync -> rename
-        text_tmp = text_path.with_suffix(".tmp")
+        # Atomic write: tmp -> fsync -> rename, computing the checksum in the same pass
+        digest = hashlib.sha256()
         try:
-            with text_tmp.open("wb") as f:
-                f.write(text_bytes)
-                f.flush()
-                os.fsync(f.fileno())
-            
-            # Rename to final path (atomic on POSIX)
-            text_tmp.rename(text_path)
-            
+            _write_atomic(text_path, text_bytes, digest)
         except Exception as e:
-            # Clean up temp file on failure
-            if text_tmp.exists():
-                text_tmp.unlink()
             raise StorageError(f"Failed to write text file: {e}")
+        checksum = digest.hexdigest()
         
         # Create metadata JSON (after text file exists)
         metadata = {
@@ -102,24 +267,16 @@ def save_text(
             metadata["size"] = metadata["file_size"]
         
         # Atomic write for metadata JSON
-        json_tmp = json_path.with_suffix(".tmp")
         try:
-            with json_tmp.open("w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2)
-                f.flush()
-                os.fsync(f.fileno())
-            
-            json_tmp.rename(json_path)
-            
+            _write_atomic(json_path, _dump_metadata(metadata))
         except Exception as e:
-            # Clean up on failure
-            if json_tmp.exists():
-                json_tmp.unlink()
             # Also remove text file since metadata failed
-            if text_path.exists():
-                text_path.unlink()
+            _unlink_quietly(text_path)
             raise StorageError(f"Failed to write metadata JSON: {e}")
         
+        # Make both renames durable with one directory sync
+        _fsync_dir(text_path.parent)
+        
         return text_path, json_path
         
     except Exception as e:
@@ -128,6 +285,51 @@ def save_text(
         raise StorageError(f"Unexpected error during text save: {e}")
 
 
+def _write_audio_metadata(
+    audio_path: Path,
+    json_path: Path,
+    *,
+    chat_id: int,
+    message_id: int,
+    size: int,
+    mime_type: str,
+    timestamp: datetime,
+    checksum: str,
+    sender_id: Optional[int],
+    duration: Optional[int],
+    include_sender_id: bool
+) -> None:
+    """Write the metadata JSON for a stored audio file and make both renames durable.
+    
+    The audio file is removed again if its metadata can't be written.
+    """
+    metadata = {
+        "timestamp": timestamp.isoformat(),
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "type": "audio",
+        "size": size,
+        "file_size": size,
+        "mime_type": mime_type,
+        "duration": duration,
+        "checksum": checksum,
+        "storage_path": str(audio_path)
+    }
+    if include_sender_id:
+        metadata["sender_id"] = sender_id
+    
+    # Atomic write for metadata JSON
+    try:
+        _write_atomic(json_path, _dump_metadata(metadata))
+    except Exception as e:
+        # Also remove audio file since metadata failed
+        _unlink_quietly(audio_path)
+        raise StorageError(f"Failed to write metadata JSON: {e}")
+    
+    # Make both renames durable with one directory sync
+    _fsync_dir(audio_path.parent)
+
+
 def save_audio(
     base_dir: Path,
     chat_id: int,
@@ -169,66 +371,120 @@ def save_audio(
         audio_path, json_path = build_paths(base_dir, date_parts, stem, extension)
         
         # Create date directory if needed
-        audio_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Compute checksum
-        checksum = hashlib.sha256(audio_data).hexdigest()
+        ensure_dir(audio_path.parent)
         
-        # Atomic write: tmp -> fsync -> rename
-        audio_tmp = audio_path.with_suffix(".tmp")
+        # Atomic write: tmp -> fsync -> rename, computing the checksum in the same pass
+        digest = hashlib.sha256()
         try:
-            with audio_tmp.open("wb") as f:
-                f.write(audio_data)
-                f.flush()
-                os.fsync(f.fileno())
-            
-            # Rename to final path (atomic on POSIX)
-            audio_tmp.rename(audio_path)
-            
+            _write_atomic(audio_path, audio_data, digest)
         except Exception as e:
-            # Clean up temp file on failure
-            if audio_tmp.exists():
-                audio_tmp.unlink()
             raise StorageError(f"Failed to write audio file: {e}")
+        checksum = digest.hexdigest()
         
-        # Create metadata JSON (after audio file exists)
-        metadata = {
-            "timestamp": timestamp.isoformat(),
-            "chat_id": chat_id,
-            "message_id": message_id,
-            "type": "audio",
-            "size": len(audio_data),
-            "file_size": len(audio_data),
-            "mime_type": mime_type,
-            "duration": duration,
-            "checksum": checksum,
-            "storage_path": str(audio_path)
-        }
-        if include_sender_id:
-            metadata["sender_id"] = sender_id
+        # Create metadata JSON (after audio file exists) and sync the directory
+        _write_audio_metadata(
+            audio_path,
+            json_path,
+            chat_id=chat_id,
+            message_id=message_id,
+            size=len(audio_data),
+            mime_type=mime_type,
+            timestamp=timestamp,
+            checksum=checksum,
+            sender_id=sender_id,
+            duration=duration,
+            include_sender_id=include_sender_id
+        )
         
-        # Atomic write for metadata JSON
-        json_tmp = json_path.with_suffix(".tmp")
+        return audio_path, json_path
+        
+    except Exception as e:
+        if isinstance(e, StorageError):
+            raise
+        raise StorageError(f"Unexpected error during audio save: {e}")
+
+
+def save_audio_from_path(
+    base_dir: Path,
+    chat_id: int,
+    message_id: int,
+    source_path: Path,
+    mime_type: str,
+    extension: str,
+    timestamp: datetime,
+    sender_id: Optional[int] = None,
+    duration: Optional[int] = None,
+    include_sender_id: bool = True
+) -> Tuple[Path, Path]:
+    """
+    Move an already-downloaded audio file into the archive with metadata JSON.
+    
+    The file is hashed in chunks and renamed into place, so the audio is
+    never held in memory. source_path must be on the same filesystem as
+    base_dir (e.g. a temp file in the date directory).
+    
+    Args:
+        base_dir: Base storage directory
+        chat_id: Telegram chat ID
+        message_id: Telegram message ID
+        source_path: Path of the downloaded audio file
+        mime_type: MIME type (e.g., "audio/ogg")
+        extension: File extension (e.g., "ogg")
+        timestamp: UTC timestamp
+        sender_id: Optional numeric sender ID (minimal PII)
+    
+    Returns:
+        Tuple of (audio_file_path, metadata_json_path)
+        
+    Raises:
+        StorageError: If storage operations fail
+    """
+    if not base_dir.exists():
+        raise StorageError(f"Base storage directory does not exist: {base_dir}")
+    
+    try:
+        # Build filename stem and paths
+        stem = build_stem(timestamp, chat_id, message_id, "audio")
+        date_parts = (timestamp.year, timestamp.month, timestamp.day)
+        audio_path, json_path = build_paths(base_dir, date_parts, stem, extension)
+        
+        # Create date directory if needed
+        ensure_dir(audio_path.parent)
+        
+        # Stream checksum, then fsync -> rename
         try:
-            with json_tmp.open("w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2)
-                f.flush()
-                os.fsync(f.fileno())
+            with open(source_path, "rb") as f:
+                # file_digest reads into a reusable buffer; no per-chunk bytes objects
+                digest = hashlib.file_digest(f, "sha256")
+                file_size = f.tell()
+                _fdatasync(f.fileno())
+                _drop_page_cache(f.fileno(), file_size)
+            checksum = digest.hexdigest()
             
-            json_tmp.rename(json_path)
+            # Rename to final path (atomic on POSIX)
+            os.replace(source_path, audio_path)
             
         except Exception as e:
-            # Clean up on failure
-            if json_tmp.exists():
-                json_tmp.unlink()
-            # Also remove audio file since metadata failed
-            if audio_path.exists():
-                audio_path.unlink()
-            raise StorageError(f"Failed to write metadata JSON: {e}")
+            raise StorageError(f"Failed to write audio file: {e}")
+        
+        # Create metadata JSON (after audio file exists) and sync the directory
+        _write_audio_metadata(
+            audio_path,
+            json_path,
+            chat_id=chat_id,
+            message_id=message_id,
+            size=file_size,
+            mime_type=mime_type,
+            timestamp=timestamp,
+            checksum=checksum,
+            sender_id=sender_id,
+            duration=duration,
+            include_sender_id=include_sender_id
+        )
         
         return audio_path, json_path
         
     except Exception as e:
         if isinstance(e, StorageError):
             raise
-        raise StorageError(f"Unexpected error during audio save: {e}")
\ No newline at end of file
+        raise StorageError(f"Unexpected error during audio save: {e}")
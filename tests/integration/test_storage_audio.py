@@ -1,5 +1,6 @@
 """Integration tests for audio storage service."""
 
+import hashlib
 import json
 import os
 import tempfile
@@ -8,7 +9,7 @@ from pathlib import Path
 
 import pytest
 
-from src.services.storage import save_audio
+from src.services.storage import save_audio, save_audio_from_path
 
 
 class TestSaveAudioIntegration:
@@ -172,4 +173,25 @@ class TestSaveAudioIntegration:
         # Check JSON can be parsed (valid UTF-8)
         with open(json_path, 'r', encoding='utf-8') as f:
             metadata = json.load(f)
-        assert metadata["file_size"] == len(audio_data)
\ No newline at end of file
+        assert metadata["file_size"] == len(audio_data)
+
+    def test_save_audio_from_path_moves_file_into_place(self, temp_storage_dir, sample_audio_data):
+        """Test that a downloaded file is renamed into the archive with matching metadata."""
+        chat_id = 24680
+        message_id = 13579
+        ts_utc = datetime(2025, 10, 1, 8, 0, 0)
+        
+        source = temp_storage_dir / "voice.download"
+        source.write_bytes(sample_audio_data)
+        
+        ogg_path, json_path = save_audio_from_path(
+            temp_storage_dir, chat_id, message_id, source, "audio/ogg", "ogg", ts_utc
+        )
+        
+        assert not source.exists()
+        assert ogg_path.read_bytes() == sample_audio_data
+        
+        with open(json_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        assert metadata["file_size"] == len(sample_audio_data)
+        assert metadata["checksum"] == hashlib.sha256(sample_audio_data).hexdigest()
@@ -11,6 +11,7 @@ Tests the storage.py module's text saving functionality including:
 import json
 import os
 import pytest
+import shutil
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
@@ -22,18 +23,22 @@ from src.services.storage import save_text, StorageError
 class TestTextStorage:
     """Integration tests for text message storage."""
     
+    @classmethod
+    def setup_class(cls) -> None:
+        """Create one temp root for the class; tests get fresh subdirectories in it."""
+        cls._temp_root = tempfile.TemporaryDirectory()
+    
+    @classmethod
+    def teardown_class(cls) -> None:
+        """Remove the temp root and every test's subdirectory in one pass."""
+        cls._temp_root.cleanup()
+    
     def setup_method(self) -> None:
-        """Set up test environment with temp directory."""
-        self.temp_dir = Path(tempfile.mkdtemp())
+        """Give the test its own empty storage directory under the shared root."""
+        self.temp_dir = Path(tempfile.mkdtemp(dir=self._temp_root.name))
         self.storage_base = self.temp_dir / "storage"
         self.storage_base.mkdir()
     
-    def teardown_method(self) -> None:
-        """Clean up test files."""
-        import shutil
-        if self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
-    
     def test_save_text_creates_file_and_metadata(self) -> None:
         """Test that text is saved with paired metadata JSON."""
         chat_id = 123456789
@@ -95,6 +100,28 @@ class TestTextStorage:
         assert expected_parent.exists()
         assert expected_parent.is_dir()
     
+    def test_save_text_recreates_removed_date_directory(self) -> None:
+        """Test that a date folder deleted between saves is created again."""
+        timestamp = datetime(2025, 12, 4, 9, 15, 30, tzinfo=timezone.utc)
+        first_path, _ = save_text(
+            base_dir=self.storage_base,
+            chat_id=999,
+            message_id=1,
+            text="First",
+            timestamp=timestamp
+        )
+        shutil.rmtree(first_path.parent)
+        
+        text_path, _ = save_text(
+            base_dir=self.storage_base,
+            chat_id=999,
+            message_id=2,
+            text="Second",
+            timestamp=timestamp
+        )
+        
+        assert text_path.read_text(encoding="utf-8") == "Second"
+    
     def test_save_text_deterministic_filenames(self) -> None:
         """Test that filenames follow the deterministic pattern."""
         timestamp = datetime(2025, 1, 15, 10, 20, 30, tzinfo=timezone.utc)
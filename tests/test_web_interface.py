@@ -1,10 +1,19 @@
 import os
 import tempfile
+from urllib.parse import quote
+
 import pytest
 from flask import Flask
+from werkzeug.exceptions import NotFound
+
+# web.app refuses to import without these
+os.environ.setdefault('PIN_CODE', '0000')
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+
+import web.app as web_app
 from web.app import app as flask_app
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
     flask_app.config['TESTING'] = True
     with flask_app.test_client() as client:
@@ -23,3 +32,93 @@ def test_api_files_empty(client):
     assert isinstance(data['files'], list)
 
 # You can add more tests for /api/content/<filename> and /api/download/<filename> if needed.
+
+DAY_DIR = os.path.join('2025', '09', '25')
+TEXT_NAME = '20250925145342-356747848-8-text.txt'
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """A storage tree with one message, plus a secret file and symlink outside it."""
+    root = tmp_path / 'storage'
+    day = root / DAY_DIR
+    day.mkdir(parents=True)
+    (day / TEXT_NAME).write_text('hello archive', encoding='utf-8')
+    secret = tmp_path / 'secret.txt'
+    secret.write_text('outside', encoding='utf-8')
+    (root / 'escape.txt').symlink_to(secret)
+    monkeypatch.setattr(web_app, 'STORAGE_DIR', str(root))
+    monkeypatch.setattr(web_app, 'STORAGE_ROOT', os.path.realpath(root))
+    monkeypatch.setattr(web_app, '_scan_cache', web_app.OrderedDict())
+    return root
+
+
+@pytest.fixture
+def auth_client(storage):
+    """Test client with a logged-in session."""
+    flask_app.config['TESTING'] = True
+    with flask_app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['authenticated'] = True
+        yield client
+
+
+@pytest.mark.parametrize('route', ['/api/content/', '/media/', '/api/download/'])
+@pytest.mark.parametrize('path', [
+    '..%2f..%2fetc%2fpasswd',
+    '..%2Fsecret.txt',
+    'escape.txt',  # symlink pointing outside storage
+])
+def test_paths_outside_storage_are_not_found(auth_client, route, path):
+    response = auth_client.get(route + path)
+    assert response.status_code == 404
+    assert b'outside' not in response.data
+
+
+@pytest.mark.parametrize('route', ['/api/content/', '/media/', '/api/download/'])
+def test_absolute_paths_are_not_found(auth_client, storage, route):
+    secret = storage.parent / 'secret.txt'
+    # The router collapses the doubled slash with a redirect; the target must not leak either
+    response = auth_client.get(route + quote(str(secret), safe=''), follow_redirects=True)
+    assert response.status_code == 404
+    assert b'outside' not in response.data
+
+
+def test_absolute_path_is_confined(storage):
+    with flask_app.test_request_context():
+        with pytest.raises(NotFound):
+            web_app.resolve_storage_path('/etc/passwd')
+
+
+def test_scan_cache_sees_new_file(auth_client, storage):
+    first = auth_client.get('/api/files').get_json()
+    assert [f['filename'] for f in first['files']] == [TEXT_NAME]
+
+    day = storage / DAY_DIR
+    new_name = '20250925150000-356747848-9-text.txt'
+    (day / new_name).write_text('later', encoding='utf-8')
+    # Coarse filesystem timestamps may not tick within a test; move the mtime on explicitly
+    st = os.stat(day)
+    os.utime(day, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    second = auth_client.get('/api/files').get_json()
+    assert [f['filename'] for f in second['files']] == [new_name, TEXT_NAME]
+
+
+def test_unchanged_files_answer_304(auth_client, monkeypatch):
+    # One validator window for the whole test
+    monkeypatch.setattr(web_app, 'SCAN_CACHE_TTL', 10**9)
+    first = auth_client.get('/api/files')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = auth_client.get('/api/files', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+    # Same caching policy as the 200, not the no-store applied to HTML pages
+    assert again.headers['Cache-Control'] == first.headers['Cache-Control']
+    assert 'no-store' not in again.headers['Cache-Control']
+
+    other_query = auth_client.get('/api/files?type=audio', headers={'If-None-Match': etag})
+    assert other_query.status_code == 200
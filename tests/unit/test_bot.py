@@ -4,54 +4,72 @@ Unit tests for the Telegram bot functionality.
 
 import asyncio
 import pytest
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from aiogram.types import Message, User, Chat
-from src.cli.bot import handle_start, safe_answer
+import src.cli.bot as bot_module
+from src.cli.bot import BUSY_TEXT, WELCOME_TEXT, handle_message, handle_start, message_worker, safe_answer
 
 
-@pytest.fixture
-def mock_message():
-    """Create a mock message for testing."""
-    message = MagicMock(spec=Message)
-    message.from_user = MagicMock(spec=User)
+# Attribute names for the mock specs, computed once. Passing the aiogram classes
+# themselves makes every MagicMock re-run dir() and probe each attribute for
+# coroutines, which dominates fixture setup.
+MESSAGE_SPEC = dir(Message)
+USER_SPEC = dir(User)
+CHAT_SPEC = dir(Chat)
+
+
+def make_message(answer) -> MagicMock:
+    """Build a Message mock (isinstance-compatible) with the given answer mock."""
+    message = MagicMock(spec=MESSAGE_SPEC)
+    message.__class__ = Message
+    message.from_user = MagicMock(spec=USER_SPEC)
     message.from_user.id = 123456789
-    message.chat = MagicMock(spec=Chat)
+    message.chat = MagicMock(spec=CHAT_SPEC)
     message.chat.id = 123456789
     message.message_id = 1
-    message.answer = AsyncMock()
+    message.answer = answer
     return message
 
 
+@pytest.fixture
+def mock_message():
+    """Create a mock message for testing."""
+    return make_message(AsyncMock())
+
+
 @pytest.fixture
 def mock_message_sync():
     """Create a mock message with sync answer for testing."""
-    message = MagicMock(spec=Message)
-    message.from_user = MagicMock(spec=User)
-    message.from_user.id = 123456789
-    message.chat = MagicMock(spec=Chat)
-    message.chat.id = 123456789
-    message.message_id = 1
-    message.answer = MagicMock()  # Non-async mock for testing fallback
-    return message
+    return make_message(MagicMock())  # Non-async mock for testing fallback
+
+
+@pytest.fixture(scope="session")
+def bot_source() -> bytes:
+    """Raw bytes of src/cli/bot.py, read once."""
+    return Path(bot_module.__file__).read_bytes()
+
+
+@pytest.fixture(scope="module")
+def welcome_text():
+    """The /start reply; handle_start sends this constant as-is."""
+    return WELCOME_TEXT
 
 
 class TestSafeAnswer:
     """Test the safe_answer function."""
     
-    @pytest.mark.asyncio
     async def test_safe_answer_async_success(self, mock_message):
         """Test safe_answer with async message.answer."""
         await safe_answer(mock_message, "Test message")
         mock_message.answer.assert_called_once_with("Test message")
     
-    @pytest.mark.asyncio
     async def test_safe_answer_sync_fallback(self, mock_message_sync):
         """Test safe_answer with sync message.answer fallback."""
         await safe_answer(mock_message_sync, "Test message")
         mock_message_sync.answer.assert_called_once_with("Test message")
     
-    @pytest.mark.asyncio
     async def test_safe_answer_with_api_error(self, mock_message):
         """Test safe_answer when Telegram API returns an error."""
         # Simulate API error
@@ -66,7 +84,6 @@ class TestSafeAnswer:
             assert kwargs['event'] == 'message_send_error'
             assert 'API Error: Forbidden' in kwargs['message']
     
-    @pytest.mark.asyncio
     async def test_safe_answer_with_unicode(self, mock_message):
         """Test safe_answer with Unicode characters."""
         unicode_text = "Вітаю! 👋 Це тестове повідомлення з емодзі."
@@ -77,7 +94,6 @@ class TestSafeAnswer:
 class TestHandleStart:
     """Test the handle_start function."""
     
-    @pytest.mark.asyncio
     async def test_handle_start_success(self, mock_message):
         """Test successful handling of /start command."""
         with patch('src.cli.bot.log_event') as mock_log, \
@@ -97,12 +113,8 @@ class TestHandleStart:
             mock_safe_answer.assert_called_once()
             call_args = mock_safe_answer.call_args[0]
             assert call_args[0] == mock_message
-            welcome_text = call_args[1]
-            assert "Вітаю!" in welcome_text
-            assert "Андрій Сазонов" in welcome_text
-            assert "InnSaga Business Club" in welcome_text
+            assert call_args[1] is WELCOME_TEXT
     
-    @pytest.mark.asyncio
     async def test_handle_start_with_safe_answer_error(self, mock_message):
         """Test handle_start when safe_answer fails."""
         with patch('src.cli.bot.log_event') as mock_log, \
@@ -121,63 +133,122 @@ class TestHandleStart:
             assert 'sending_welcome_message' in events
             assert 'start_response_error' in events
     
-    @pytest.mark.asyncio 
-    async def test_handle_start_message_content(self, mock_message):
+    @pytest.mark.parametrize("needle", [
+        "Вітаю!",
+        "👋",
+        "Андрій Сазонов",
+        "InnSaga Business Club",
+        "штучного інтелекту",
+        "голосове",
+        "Дякую!",
+        "<b>InnSaga Business Club</b>",  # HTML formatting is present
+    ])
+    def test_handle_start_message_content(self, welcome_text, needle):
         """Test that the welcome message contains all required content."""
-        with patch('src.cli.bot.log_event'), \
-             patch('src.cli.bot.safe_answer') as mock_safe_answer:
-            
-            await handle_start(mock_message)
-            
-            # Get the welcome message text
-            welcome_text = mock_safe_answer.call_args[0][1]
-            
-            # Check required content
-            assert "Вітаю!" in welcome_text
-            assert "👋" in welcome_text
-            assert "Андрій Сазонов" in welcome_text
-            assert "InnSaga Business Club" in welcome_text
-            assert "штучного інтелекту" in welcome_text
-            assert "голосове" in welcome_text
-            assert "Дякую!" in welcome_text
-            
-            # Check HTML formatting is present
-            assert "<b>InnSaga Business Club</b>" in welcome_text
+        assert needle in welcome_text
 
 
 class TestWelcomeMessageEncoding:
     """Test Unicode and encoding issues in welcome message."""
     
-    def test_welcome_message_unicode_integrity(self):
+    def test_welcome_message_unicode_integrity(self, bot_source):
         """Test that welcome message doesn't contain corrupted Unicode."""
-        # Import the actual welcome text from the module
-        from src.cli.bot import handle_start
-        import inspect
-        
-        # Get source code and check for corrupted characters
-        source = inspect.getsource(handle_start)
-        
-        # Check that there are no Unicode replacement characters
-        assert "�" not in source, "Found corrupted Unicode character in source"
+        # Check that there are no Unicode replacement characters (U+FFFD)
+        assert "�".encode() not in bot_source, "Found corrupted Unicode character in source"
         
         # Check that emoji is properly encoded
-        assert "👋" in source or "\\U0001f44b" in source, "Missing wave emoji"
+        assert "👋".encode() in bot_source or b"\\U0001f44b" in bot_source, "Missing wave emoji"
     
-    @pytest.mark.asyncio
-    async def test_welcome_message_encoding(self, mock_message):
+    def test_welcome_message_encoding(self, welcome_text):
         """Test that welcome message can be properly encoded/decoded."""
-        with patch('src.cli.bot.log_event'), \
+        # Test that text can be encoded/decoded without errors
+        try:
+            encoded = welcome_text.encode('utf-8')
+            decoded = encoded.decode('utf-8')
+            assert decoded == welcome_text
+        except UnicodeEncodeError:
+            pytest.fail("Welcome message contains characters that cannot be UTF-8 encoded")
+        except UnicodeDecodeError:
+            pytest.fail("Welcome message cannot be UTF-8 decoded")
+
+
+class TestMessageQueue:
+    """Test the background storage queue."""
+
+    async def test_full_queue_replies_busy(self, mock_message, monkeypatch, tmp_path):
+        """A message arriving while the queue is full gets the busy reply."""
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(("queued", tmp_path, None))
+        monkeypatch.setattr(bot_module, "work_queue", queue)
+        monkeypatch.setattr(bot_module, "storage_root", tmp_path)
+        monkeypatch.setattr(bot_module, "rate_limiter", MagicMock())
+        mock_message.text = "hello"
+
+        with patch('src.cli.bot.safe_answer') as mock_safe_answer:
+            await handle_message(mock_message)
+
+        mock_safe_answer.assert_called_once_with(mock_message, BUSY_TEXT)
+        assert queue.qsize() == 1
+
+    async def test_chat_order_kept_without_blocking_other_chats(self, tmp_path):
+        """One chat's messages are stored in order while other chats keep moving."""
+        processed = []
+
+        async def fake_process(message, storage_base, timestamp):
+            # Make the first message of chat 1 the slowest
+            slow = (message.chat.id, message.message_id) == (1, 1)
+            await asyncio.sleep(0.05 if slow else 0)
+            processed.append((message.chat.id, message.message_id))
+
+        queue = asyncio.Queue()
+        for chat_id, message_id in [(1, 1), (1, 2), (2, 1), (1, 3), (2, 2)]:
+            message = make_message(AsyncMock())
+            message.chat.id = chat_id
+            message.message_id = message_id
+            queue.put_nowait((message, tmp_path, None))
+
+        with patch('src.cli.bot.process_message', side_effect=fake_process):
+            workers = [asyncio.create_task(message_worker(queue)) for _ in range(2)]
+            await asyncio.wait_for(queue.join(), 1)
+            for worker in workers:
+                worker.cancel()
+
+        assert [m for c, m in processed if c == 1] == [1, 2, 3]
+        # Chat 2 finished while chat 1's first message was still in progress
+        assert processed[:2] == [(2, 1), (2, 2)]
+        assert bot_module.chat_backlogs == {}
+
+    async def test_full_chat_backlog_replies_busy(self, tmp_path, monkeypatch):
+        """Messages beyond a busy chat's backlog cap are rejected, not parked."""
+        monkeypatch.setattr(bot_module, "CHAT_BACKLOG_SIZE", 2)
+        release = asyncio.Event()
+        processed = []
+
+        async def fake_process(message, storage_base, timestamp):
+            if message.message_id == 1:
+                await release.wait()
+            processed.append(message.message_id)
+
+        queue = asyncio.Queue()
+        messages = []
+        for message_id in range(1, 6):
+            message = make_message(AsyncMock())
+            message.message_id = message_id
+            messages.append(message)
+            queue.put_nowait((message, tmp_path, None))
+
+        with patch('src.cli.bot.process_message', side_effect=fake_process), \
              patch('src.cli.bot.safe_answer') as mock_safe_answer:
-            
-            await handle_start(mock_message)
-            welcome_text = mock_safe_answer.call_args[0][1]
-            
-            # Test that text can be encoded/decoded without errors
-            try:
-                encoded = welcome_text.encode('utf-8')
-                decoded = encoded.decode('utf-8')
-                assert decoded == welcome_text
-            except UnicodeEncodeError:
-                pytest.fail("Welcome message contains characters that cannot be UTF-8 encoded")
-            except UnicodeDecodeError:
-                pytest.fail("Welcome message cannot be UTF-8 decoded")
\ No newline at end of file
+            workers = [asyncio.create_task(message_worker(queue)) for _ in range(2)]
+            while queue.qsize():
+                await asyncio.sleep(0)
+            assert bot_module.pending_message_count(queue) == 2
+            release.set()
+            await asyncio.wait_for(queue.join(), 1)
+            for worker in workers:
+                worker.cancel()
+
+        assert processed == [1, 2, 3]
+        assert [c.args for c in mock_safe_answer.call_args_list] == [
+            (messages[3], BUSY_TEXT), (messages[4], BUSY_TEXT)
+        ]
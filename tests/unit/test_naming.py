@@ -15,22 +15,18 @@ from src.lib.naming import build_stem, build_paths
 class TestFilenameBuilder:
     """Tests for filename building functions."""
     
-    def test_build_stem_basic(self) -> None:
-        """Test basic stem building with standard inputs."""
-        ts = datetime(2025, 9, 25, 14, 30, 45, tzinfo=timezone.utc)
-        result = build_stem(ts, 123456789, 42, "text")
-        
-        # Should follow pattern: {ts_utc}-{chat_id}-{message_id}-{type}
-        expected = "20250925143045-123456789-42-text"
-        assert result == expected
-    
-    def test_build_stem_audio_type(self) -> None:
-        """Test stem building for audio messages."""
-        ts = datetime(2025, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
-        result = build_stem(ts, 999, 1, "audio")
-        
-        expected = "20250101000000-999-1-audio"
-        assert result == expected
+    @pytest.mark.parametrize("ts,chat_id,message_id,msg_type,expected", [
+        # Pattern: {ts_utc}-{chat_id}-{message_id}-{type}
+        (datetime(2025, 9, 25, 14, 30, 45, tzinfo=timezone.utc), 123456789, 42, "text",
+         "20250925143045-123456789-42-text"),
+        (datetime(2025, 1, 1, 0, 0, 0, tzinfo=timezone.utc), 999, 1, "audio",
+         "20250101000000-999-1-audio"),
+    ])
+    def test_build_stem(
+        self, ts: datetime, chat_id: int, message_id: int, msg_type: str, expected: str
+    ) -> None:
+        """Test stem building for text and audio messages."""
+        assert build_stem(ts, chat_id, message_id, msg_type) == expected
     
     def test_build_stem_stability(self) -> None:
         """Test that same inputs always produce same stem."""
@@ -43,32 +39,27 @@ class TestFilenameBuilder:
         assert result1 == result2
         assert result1 == "20251231235959-987654321-100-text"
     
-    def test_build_paths_with_extension(self) -> None:
-        """Test building full paths with extension."""
-        base_dir = Path("/storage")
-        date_parts = (2025, 9, 25)  # year, month, day
-        stem = "20250925143045-123456789-42-text"
-        
-        text_path, json_path = build_paths(base_dir, date_parts, stem, "txt")
-        
-        expected_text = Path("/storage/2025/09/25/20250925143045-123456789-42-text.txt")
-        expected_json = Path("/storage/2025/09/25/20250925143045-123456789-42-text.json")
-        
-        assert text_path == expected_text
-        assert json_path == expected_json
-    
-    def test_build_paths_audio_extension(self) -> None:
-        """Test path building for audio files."""
-        base_dir = Path("/data")
-        date_parts = (2025, 2, 14)
-        stem = "20250214120000-555-99-audio"
-        
-        audio_path, json_path = build_paths(base_dir, date_parts, stem, "ogg")
-        
-        expected_audio = Path("/data/2025/02/14/20250214120000-555-99-audio.ogg")
-        expected_json = Path("/data/2025/02/14/20250214120000-555-99-audio.json")
+    @pytest.mark.parametrize("base_dir,date_parts,stem,ext,expected_primary,expected_json", [
+        (Path("/storage"), (2025, 9, 25), "20250925143045-123456789-42-text", "txt",
+         Path("/storage/2025/09/25/20250925143045-123456789-42-text.txt"),
+         Path("/storage/2025/09/25/20250925143045-123456789-42-text.json")),
+        (Path("/data"), (2025, 2, 14), "20250214120000-555-99-audio", "ogg",
+         Path("/data/2025/02/14/20250214120000-555-99-audio.ogg"),
+         Path("/data/2025/02/14/20250214120000-555-99-audio.json")),
+    ])
+    def test_build_paths(
+        self,
+        base_dir: Path,
+        date_parts: tuple,
+        stem: str,
+        ext: str,
+        expected_primary: Path,
+        expected_json: Path,
+    ) -> None:
+        """Test building full primary and metadata paths with extension."""
+        primary_path, json_path = build_paths(base_dir, date_parts, stem, ext)
         
-        assert audio_path == expected_audio
+        assert primary_path == expected_primary
         assert json_path == expected_json
     
     def test_build_paths_creates_date_hierarchy(self) -> None:
@@ -19,43 +19,37 @@ class TestMimeAndExtValidation:
         result = validate_mime_and_ext("audio/ogg", "ogg")
         assert result is True
     
-    def test_accept_common_audio_formats(self) -> None:
+    @pytest.mark.parametrize("mime_type,ext", [
+        ("audio/ogg", "ogg"),
+        ("audio/mpeg", "mp3"),
+        ("audio/mp4", "m4a"),
+        ("audio/wav", "wav"),
+    ])
+    def test_accept_common_audio_formats(self, mime_type: str, ext: str) -> None:
         """Test acceptance of common audio formats."""
-        valid_combinations = [
-            ("audio/ogg", "ogg"),
-            ("audio/mpeg", "mp3"),
-            ("audio/mp4", "m4a"),
-            ("audio/wav", "wav"),
-        ]
-        
-        for mime_type, ext in valid_combinations:
-            assert validate_mime_and_ext(mime_type, ext) is True
+        assert validate_mime_and_ext(mime_type, ext) is True
     
-    def test_reject_unsupported_mime_types(self) -> None:
-        """Test rejection of unsupported MIME types."""        
-        invalid_types = [
-            ("video/mp4", "mp4"),
-            ("image/jpeg", "jpg"),
-            ("application/pdf", "pdf"),
-            ("text/plain", "txt"),
-            ("audio/unknown", "xyz"),
-        ]
-        
-        for mime_type, ext in invalid_types:
-            with pytest.raises(ValidationError):
-                validate_mime_and_ext(mime_type, ext)
+    @pytest.mark.parametrize("mime_type,ext", [
+        ("video/mp4", "mp4"),
+        ("image/jpeg", "jpg"),
+        ("application/pdf", "pdf"),
+        ("text/plain", "txt"),
+        ("audio/unknown", "xyz"),
+    ])
+    def test_reject_unsupported_mime_types(self, mime_type: str, ext: str) -> None:
+        """Test rejection of unsupported MIME types."""
+        with pytest.raises(ValidationError):
+            validate_mime_and_ext(mime_type, ext)
     
-    def test_reject_mismatched_mime_and_ext(self) -> None:
+    @pytest.mark.parametrize("mime_type,ext", [
+        ("audio/ogg", "mp3"),  # OGG MIME with MP3 extension
+        ("audio/mpeg", "ogg"),  # MP3 MIME with OGG extension
+        ("audio/wav", "mp4"),   # WAV MIME with MP4 extension
+    ])
+    def test_reject_mismatched_mime_and_ext(self, mime_type: str, ext: str) -> None:
         """Test rejection when MIME type doesn't match extension."""
-        mismatches = [
-            ("audio/ogg", "mp3"),  # OGG MIME with MP3 extension
-            ("audio/mpeg", "ogg"),  # MP3 MIME with OGG extension
-            ("audio/wav", "mp4"),   # WAV MIME with MP4 extension
-        ]
-        
-        for mime_type, ext in mismatches:
-            with pytest.raises(ValidationError):
-                validate_mime_and_ext(mime_type, ext)
+        with pytest.raises(ValidationError):
+            validate_mime_and_ext(mime_type, ext)
     
     def test_case_insensitive_extensions(self) -> None:
         """Test that extensions are handled case-insensitively."""
@@ -68,61 +62,46 @@ class TestMimeAndExtValidation:
 class TestSizeValidation:
     """Tests for file size validation."""
     
-    def test_accept_small_files(self) -> None:
-        """Test that small files are accepted."""
-        small_sizes = [100, 1024, 1024 * 10, 1024 * 100]  # Up to 100KB
-        limit = 1024 * 1024  # 1MB limit
-        
-        for size in small_sizes:
-            assert validate_size(size, limit) is True
+    @pytest.mark.parametrize("size,limit", [
+        # Small files (up to 100KB) under a 1MB limit
+        (100, 1024 * 1024),
+        (1024, 1024 * 1024),
+        (1024 * 10, 1024 * 1024),
+        (1024 * 100, 1024 * 1024),
+        # Exactly at the limit
+        (1024 * 1024 * 50, 1024 * 1024 * 50),
+        # Typical voice message sizes under the 50MB default (from config)
+        (1024 * 100, 52428800),
+        (1024 * 1024, 52428800),
+        (1024 * 1024 * 5, 52428800),
+        (52428800 - 1000, 52428800),  # Just under limit
+    ])
+    def test_accept_sizes_within_limit(self, size: int, limit: int) -> None:
+        """Test that files up to and including the limit are accepted."""
+        assert validate_size(size, limit) is True
     
-    def test_accept_files_at_limit(self) -> None:
-        """Test that files exactly at the limit are accepted."""
-        limit = 1024 * 1024 * 50  # 50MB
-        assert validate_size(limit, limit) is True
-    
-    def test_reject_oversized_files(self) -> None:
+    @pytest.mark.parametrize("size,limit", [
+        (1024 * 1024 * 10 + 1, 1024 * 1024 * 10),
+        (1024 * 1024 * 10 * 2, 1024 * 1024 * 10),
+        (1024 * 1024 * 10 * 10, 1024 * 1024 * 10),
+        (1024 * 1024 * 1024, 1024 * 1024 * 10),  # 1GB
+        (52428800 + 1, 52428800),  # Just over the 50MB default
+    ])
+    def test_reject_oversized_files(self, size: int, limit: int) -> None:
         """Test that files over the limit are rejected."""
-        limit = 1024 * 1024 * 10  # 10MB
-        oversized = [
-            limit + 1,
-            limit * 2,
-            limit * 10,
-            1024 * 1024 * 1024,  # 1GB
-        ]
-        
-        for size in oversized:
-            with pytest.raises(ValidationError):
-                validate_size(size, limit)
+        with pytest.raises(ValidationError):
+            validate_size(size, limit)
     
-    def test_reject_negative_sizes(self) -> None:
+    @pytest.mark.parametrize("size,limit", [
+        (-1, 1024),
+        (-1000, 1024 * 1024),
+    ])
+    def test_reject_negative_sizes(self, size: int, limit: int) -> None:
         """Test that negative sizes are rejected."""
         with pytest.raises(ValidationError):
-            validate_size(-1, 1024)
-        
-        with pytest.raises(ValidationError):
-            validate_size(-1000, 1024 * 1024)
+            validate_size(size, limit)
     
     def test_reject_zero_size(self) -> None:
         """Test that zero-byte files are rejected."""
         with pytest.raises(ValidationError):
             validate_size(0, 1024 * 1024)
-    
-    def test_default_audio_limit(self) -> None:
-        """Test validation with typical audio file limit (50MB)."""
-        limit = 52428800  # 50MB (from config default)
-        
-        # Should accept typical voice message sizes
-        typical_sizes = [
-            1024 * 100,      # 100KB
-            1024 * 1024,     # 1MB
-            1024 * 1024 * 5, # 5MB
-            limit - 1000,    # Just under limit
-        ]
-        
-        for size in typical_sizes:
-            assert validate_size(size, limit) is True
-        
-        # Should reject files over 50MB
-        with pytest.raises(ValidationError):
-            validate_size(limit + 1, limit)
\ No newline at end of file
@@ -6,19 +6,71 @@ Provides web-based access to collected messages and audio files.
 
 import os
 import re
+import sys
 import json
 import hashlib
-from datetime import datetime, timedelta
-from pathlib import Path
+import heapq
+import hmac
+import mmap
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from typing import List, Dict, Optional
+from urllib.parse import quote
 from flask import Flask, render_template, request, jsonify, send_file, abort, session, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import NotFound
+from werkzeug.http import is_resource_modified
 import mimetypes
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes responses with orjson, straight to bytes"""
+
+    def _options(self) -> int:
+        # Datetimes go through self.default so they keep Flask's HTTP date format
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        return options | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def response(self, *args, **kwargs):
+        if self.compact is None and self._app.debug:
+            # Keep the indented debug output of the default provider
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(
+            obj,
+            default=self.default,
+            option=self._options() | orjson.OPT_APPEND_NEWLINE,
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Configuration
 STORAGE_DIR = os.environ.get('STORAGE_DIR', '/opt/tg-collector/storage')
 DEBUG = os.environ.get('DEBUG', 'false').lower() == 'true'
+# Symlink-free absolute form of STORAGE_DIR, used to confine file requests to it
+STORAGE_ROOT = os.path.realpath(STORAGE_DIR)
+# Offload file transfers to the reverse proxy: X_ACCEL_PREFIX names an nginx
+# `internal` location aliased to the storage dir; USE_X_SENDFILE is for Apache mod_xsendfile
+X_ACCEL_PREFIX = os.environ.get('X_ACCEL_PREFIX', '')
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
 
 # Security: PIN_CODE and SECRET_KEY are REQUIRED in production
 PIN_CODE = os.environ.get('PIN_CODE')
@@ -40,35 +92,60 @@ if SECRET_KEY == 'change-this-secret-key-in-production':
 
 app.secret_key = SECRET_KEY
 
-# Rate limiting for PIN attempts
-failed_attempts = {}
+# Rate limiting for PIN attempts: client IP -> (failed attempts, monotonic time of last failure).
+# Ordered oldest-failure first; entries expire LOCKOUT_TIME after their last failure
+# and at most MAX_TRACKED_IPS are kept, so the table stays bounded under attack.
+failed_attempts: "OrderedDict[str, tuple]" = OrderedDict()
+_attempts_lock = threading.Lock()
 LOCKOUT_TIME = 300  # 5 minutes lockout
 MAX_ATTEMPTS = 3
+MAX_TRACKED_IPS = 10000
 
+# Encoded once for hmac.compare_digest (constant-time, no early exit on mismatch)
+PIN_BYTES = PIN_CODE.encode('utf-8')
+
+
+def _expire_attempts(now):
+    """Drop entries whose last failure is older than LOCKOUT_TIME (caller holds the lock)."""
+    while failed_attempts:
+        client_ip, (_, last_attempt) = next(iter(failed_attempts.items()))
+        if now - last_attempt < LOCKOUT_TIME:
+            break
+        del failed_attempts[client_ip]
 
 def check_ip_lockout(client_ip):
-    """Check if IP is locked out due to too many failed attempts"""
-    if client_ip in failed_attempts:
-        attempts, last_attempt = failed_attempts[client_ip]
-        if attempts >= MAX_ATTEMPTS:
-            if datetime.now() - last_attempt < timedelta(seconds=LOCKOUT_TIME):
-                return True
-            else:
-                # Lockout expired, reset attempts
-                del failed_attempts[client_ip]
-    return False
+    """Seconds left in this IP's lockout (0 if it isn't locked out)"""
+    now = time.monotonic()
+    with _attempts_lock:
+        _expire_attempts(now)
+        attempts, last_attempt = failed_attempts.get(client_ip, (0, now))
+    if attempts >= MAX_ATTEMPTS:
+        return max(int(LOCKOUT_TIME - (now - last_attempt)), 1)
+    return 0
 
 def record_failed_attempt(client_ip):
-    """Record a failed login attempt"""
-    now = datetime.now()
-    if client_ip in failed_attempts:
-        attempts, _ = failed_attempts[client_ip]
-        failed_attempts[client_ip] = (attempts + 1, now)
-    else:
-        failed_attempts[client_ip] = (1, now)
-
+    """Record a failed login attempt and return this IP's failure count"""
+    now = time.monotonic()
+    with _attempts_lock:
+        attempts = failed_attempts.pop(client_ip, (0, now))[0] + 1
+        failed_attempts[client_ip] = (attempts, now)
+        while len(failed_attempts) > MAX_TRACKED_IPS:
+            failed_attempts.popitem(last=False)
+    return attempts
+
+def clear_failed_attempts(client_ip):
+    """Forget failed attempts for an IP after a successful login"""
+    with _attempts_lock:
+        failed_attempts.pop(client_ip, None)
+
+# Endpoints reachable without logging in; unmatched URLs (no endpoint) fall through to 404
+PUBLIC_ENDPOINTS = {'login', 'logout', 'static'}
+
+@app.before_request
 def require_auth():
-    """Check if user is authenticated, redirect to login if not"""
+    """Redirect every request for a protected endpoint to login until authenticated"""
+    if request.endpoint is None or request.endpoint in PUBLIC_ENDPOINTS:
+        return None
     if not session.get('authenticated'):
         return redirect(url_for('login'))
     return None
@@ -79,8 +156,8 @@ def login():
     client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
     
     # Check if IP is locked out
-    if check_ip_lockout(client_ip):
-        remaining = LOCKOUT_TIME - (datetime.now() - failed_attempts[client_ip][1]).seconds
+    remaining = check_ip_lockout(client_ip)
+    if remaining:
         return render_template('login.html', 
                              error=f'Too many failed attempts. Try again in {remaining} seconds.',
                              lockout=True), 429
@@ -88,21 +165,19 @@ def login():
     if request.method == 'POST':
         pin = request.form.get('pin', '').strip()
         
-        if pin == PIN_CODE:
+        if hmac.compare_digest(pin.encode('utf-8'), PIN_BYTES):
             # Successful login
             session['authenticated'] = True
             session.permanent = True
             app.permanent_session_lifetime = timedelta(hours=24)  # 24 hour session
             
             # Clear failed attempts for this IP
-            if client_ip in failed_attempts:
-                del failed_attempts[client_ip]
+            clear_failed_attempts(client_ip)
                 
             return redirect(url_for('index'))
         else:
             # Failed login
-            record_failed_attempt(client_ip)
-            attempts_left = MAX_ATTEMPTS - failed_attempts[client_ip][0]
+            attempts_left = MAX_ATTEMPTS - record_failed_attempt(client_ip)
             
             if attempts_left <= 0:
                 return render_template('login.html', 
@@ -131,42 +206,232 @@ def add_no_cache_headers(response):
         response.headers['Expires'] = '0'
     return response
 
+# Pattern: YYYYMMDDHHMMSS-USERID-SEQ-TYPE.ext
+FILENAME_RE = re.compile(r'^(\d{14})-(\d+)-(\d+)-(text|audio)\.(.+)$')
+
+def parse_stamp(dt_str: str) -> Optional[datetime]:
+    """Parse a YYYYMMDDHHMMSS stamp (None if it isn't a valid date)."""
+    try:
+        # Fixed-width digits: slicing is much cheaper than strptime
+        return datetime(
+            int(dt_str[0:4]), int(dt_str[4:6]), int(dt_str[6:8]),
+            int(dt_str[8:10]), int(dt_str[10:12]), int(dt_str[12:14]),
+        )
+    except ValueError:
+        return None
+
 def parse_filename(filename: str) -> Optional[Dict]:
     """Parse ArchiveDrop filename into components (supports 20250925150427-356747848-11-text.txt)."""
-    # Pattern: YYYYMMDDHHMMSS-USERID-SEQ-TYPE.txt
-    pattern = r'^(\d{14})-(\d+)-(\d+)-(text|audio)\.(.+)$'
-    match = re.match(pattern, filename)
+    # Cheap positional check first: most non-archive names fail it without the regex
+    if len(filename) < 25 or filename[14] != '-' or not filename[:14].isdigit():
+        return None
+    match = FILENAME_RE.match(filename)
     if not match:
         return None
     dt_str, user_id, seq, msg_type, ext = match.groups()
-    try:
-        dt = datetime.strptime(dt_str, "%Y%m%d%H%M%S")
-    except Exception:
+    dt = parse_stamp(dt_str)
+    if dt is None:
         return None
+    iso = dt.isoformat()
     return {
         'filename': filename,
-        'datetime': dt,
+        # JSON-ready: fixed-width ISO (sorts chronologically) plus the display form
+        'datetime': iso,
+        'datetime_str': iso.replace('T', ' '),
         'date': dt_str[:8],
         'time': dt_str[8:],
         'type': msg_type,
         'user_id': user_id,
         'seq': seq,
         'extension': ext,
-        'size': get_file_size(filename)
     }
 
-def get_file_size(filename: str) -> int:
-    """Get file size in bytes."""
+def iter_files(directory: str, date_parts: tuple = ()):
+    """Yield DirEntry objects for all regular files below directory (recursive).
+
+    DirEntry caches the stat result, so callers get sizes without extra syscalls.
+    date_parts, e.g. ('2025', '09', '25'), prunes the YYYY/MM/DD storage layout:
+    a digit-named directory of the expected width is only entered if it matches.
+    """
     try:
-        return os.path.getsize(os.path.join(STORAGE_DIR, filename))
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    name = entry.name
+                    if date_parts and len(name) == len(date_parts[0]) and name.isdigit():
+                        if name != date_parts[0]:
+                            continue
+                        yield from iter_files(entry.path, date_parts[1:])
+                    else:
+                        yield from iter_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
     except OSError:
-        return 0
+        return
+
+def date_dir_parts(date_filter: Optional[str]) -> tuple:
+    """Split a YYYYMMDD filter into storage directory names (empty if not a full date)."""
+    if date_filter and len(date_filter) == 8 and date_filter.isdigit():
+        return (date_filter[:4], date_filter[4:6], date_filter[6:])
+    return ()
+
+# Text files are searched in chunks of this many characters (or bytes, for ASCII queries)
+SEARCH_CHUNK_CHARS = 64 * 1024
+
+def file_contains(path: str, needle: str) -> bool:
+    """Case-insensitive search of a UTF-8 text file for an already-lowercased needle.
+
+    Reads the file in chunks, so large transcripts are never held (or
+    lowercased) in memory in full. Chunks overlap by len(needle) - 1 characters
+    so matches spanning a boundary are still found. ASCII needles go through
+    mmap_contains() instead.
+    """
+    if needle.isascii():
+        return mmap_contains(path, needle.encode('ascii'))
+    overlap = len(needle) - 1
+    tail = ''
+    with open(path, encoding='utf-8') as f:
+        while True:
+            chunk = f.read(SEARCH_CHUNK_CHARS)
+            if not chunk:
+                return False
+            window = tail + chunk.lower()
+            if needle in window:
+                return True
+            tail = window[-overlap:] if overlap else ''
+
+def mmap_contains(path: str, needle: bytes) -> bool:
+    """Case-insensitive search of a file's raw bytes for a lowercased ASCII needle.
+
+    The file is mapped rather than read: an exact-case find runs over the page
+    cache without copying, and only if it misses are windows lowered
+    (bytes.lower() folds ASCII only, which is all such a needle can match).
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(needle) != -1:
+                return True
+            overlap = len(needle) - 1
+            for start in range(0, size, SEARCH_CHUNK_CHARS):
+                if needle in mm[max(start - overlap, 0):start + SEARCH_CHUNK_CHARS].lower():
+                    return True
+    return False
+
+# Threads used to search text files concurrently (reads release the GIL)
+SEARCH_WORKERS = 8
+
+# Lowercased contents of searched text files, so repeat searches skip the disk.
+# Keyed by path and validated against (mtime, size); LRU-bounded by the memory the
+# strings take (Cyrillic text is 2 bytes per character in CPython), per worker process.
+# Only .txt bodies are cached: .json sidecars repeat what the listing already shows.
+SEARCH_CACHE_MAX_BYTES = 4 * 1024 * 1024
+SEARCH_CACHE_MAX_FILE_BYTES = 256 * 1024  # larger files are streamed, never cached
+_search_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_search_cache_bytes = 0
+_search_cache_lock = threading.Lock()
+
+def _cache_text(path: str, stamp: tuple, lowered: str) -> None:
+    """Store a file's lowercased text, evicting least recently used entries."""
+    global _search_cache_bytes
+    size = sys.getsizeof(lowered)
+    with _search_cache_lock:
+        old = _search_cache.pop(path, None)
+        if old is not None:
+            _search_cache_bytes -= old[2]
+        _search_cache[path] = (stamp, lowered, size)
+        _search_cache_bytes += size
+        while _search_cache_bytes > SEARCH_CACHE_MAX_BYTES:
+            _, (_, _, evicted_size) = _search_cache.popitem(last=False)
+            _search_cache_bytes -= evicted_size
+
+def search_file(entry: os.DirEntry, needle: str) -> bool:
+    """Search one text file for an already-lowercased needle; unreadable files don't match."""
+    try:
+        st = entry.stat(follow_symlinks=False)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with _search_cache_lock:
+            cached = _search_cache.get(entry.path)
+            if cached is not None:
+                _search_cache.move_to_end(entry.path)
+        if cached is not None and cached[0] == stamp:
+            return needle in cached[1]
+        if st.st_size > SEARCH_CACHE_MAX_FILE_BYTES or not entry.name.endswith('.txt'):
+            return file_contains(entry.path, needle)
+        with open(entry.path, encoding='utf-8') as f:
+            lowered = f.read().lower()
+        _cache_text(entry.path, stamp, lowered)
+        return needle in lowered
+    except Exception:
+        return False
+
+# scan_files results are reused until storage changes (SCAN_CACHE_TTL caps staleness
+# for changes outside the newest date folder); least recently used keys are evicted
+SCAN_CACHE_TTL = 30.0
+SCAN_CACHE_MAX_ENTRIES = 64
+_scan_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_scan_cache_lock = threading.Lock()
+
+def _storage_mtime() -> tuple:
+    """mtimes of the storage root and its newest YYYY/MM/DD directory chain.
+
+    New messages land in the newest day folder, so this catches them with
+    a handful of syscalls instead of a full walk. Empty if the root is missing.
+    """
+    mtimes = []
+    directory = STORAGE_DIR
+    for _ in range(4):
+        try:
+            with os.scandir(directory) as entries:
+                newest = max(
+                    (e for e in entries if e.name.isdigit() and e.is_dir(follow_symlinks=False)),
+                    key=lambda e: e.name,
+                    default=None,
+                )
+            mtimes.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            break
+        if newest is None:
+            break
+        directory = newest.path
+    return tuple(mtimes)
 
 def scan_files(
     date_filter: Optional[str] = None,
     type_filter: Optional[str] = None,
     search_query: Optional[str] = None,
     limit: int = 100,
+) -> List[Dict]:
+    """Cached front for _scan_files; returns fresh dicts callers may modify.
+
+    Entries are dropped as soon as the root or newest date folder mtimes change,
+    and in any case after SCAN_CACHE_TTL seconds.
+    """
+    key = (date_filter, type_filter, search_query, limit)
+    tree_mtime = _storage_mtime()
+    now = time.monotonic()
+    with _scan_cache_lock:
+        cached = _scan_cache.get(key)
+        if cached is not None:
+            _scan_cache.move_to_end(key)
+    if cached is not None and now - cached[1] < SCAN_CACHE_TTL and cached[2] == tree_mtime:
+        files = cached[0]
+    else:
+        files = _scan_files(date_filter, type_filter, search_query, limit)
+        with _scan_cache_lock:
+            _scan_cache[key] = (files, now, tree_mtime)
+            _scan_cache.move_to_end(key)
+            while len(_scan_cache) > SCAN_CACHE_MAX_ENTRIES:
+                _scan_cache.popitem(last=False)
+    return [dict(f) for f in files]
+
+def _scan_files(
+    date_filter: Optional[str] = None,
+    type_filter: Optional[str] = None,
+    search_query: Optional[str] = None,
+    limit: int = 100,
 ) -> List[Dict]:
     """Recursively scan storage directory and aggregate primary files.
 
@@ -174,150 +439,202 @@ def scan_files(
     For audio: prefer media files (.ogg/.mp3/.m4a/.wav) over .json metadata.
     """
     media_exts = {"ogg", "mp3", "m4a", "wav"}
-    aggregated: Dict[str, Dict] = {}
+    primary: Dict[str, Dict] = {}  # stem -> file_info of the primary file
+    meta: Dict[str, str] = {}  # stem -> relpath of its .json sidecar
+    search_needle = search_query.lower() if search_query else ''
+    pending: List[tuple] = []  # (stem, file_info, DirEntry) of text files awaiting the content search
+
+    def add(base_key: str, file_info: Dict) -> None:
+        """Record file_info as its stem's primary file or metadata sidecar."""
+        ext = file_info['extension'].lower()
+        if ext == 'json':
+            meta[base_key] = file_info['relpath']
+        elif (file_info['type'] == 'audio' and ext in media_exts) or (file_info['type'] == 'text' and ext == 'txt'):
+            # Preferred primary (.txt / media) replaces any other file seen for this stem
+            primary[base_key] = file_info
+        else:
+            primary.setdefault(base_key, file_info)
+
     try:
-        storage_path = Path(STORAGE_DIR)
-        if not storage_path.exists():
-            return []
-        # Recursively walk through all files
-        for filepath in storage_path.rglob('*'):
-            if not filepath.is_file():
+        # Recursively walk through all files (a missing root yields nothing)
+        type_marker = f'-{type_filter}.' if type_filter else None
+        for entry in iter_files(STORAGE_DIR, date_dir_parts(date_filter)):
+            name = entry.name
+            # Date and type are a fixed prefix/infix of the name: reject on those before the regex
+            if date_filter and not name.startswith(date_filter):
+                continue
+            if type_marker and type_marker not in name:
                 continue
-            file_info = parse_filename(filepath.name)
+            file_info = parse_filename(name)
             if not file_info:
                 continue
-            # Ensure size is taken from the actual path (handles nested dirs)
-            try:
-                file_info['size'] = filepath.stat().st_size
-            except Exception:
-                pass
-            # Keep relative path for nested directories
-            try:
-                file_info['relpath'] = str(filepath.relative_to(storage_path).as_posix())
-            except Exception:
-                file_info['relpath'] = filepath.name
-            # Group by base name without extension (includes -text/-audio)
-            base_key = filepath.stem  # e.g., 20250925145342-356747848-8-audio
-
-            # Apply basic pre-filters before aggregation when possible
             if date_filter and file_info['date'] != date_filter:
                 continue
             if type_filter and file_info['type'] != type_filter:
                 continue
-            # Search in text files content only
+            try:
+                file_info['size'] = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                file_info['size'] = 0
+            # Keep relative path for nested directories
+            file_info['relpath'] = os.path.relpath(entry.path, STORAGE_DIR).replace(os.sep, '/')
+            # Group by base name without extension (includes -text/-audio)
+            base_key = os.path.splitext(name)[0]  # e.g., 20250925145342-356747848-8-audio
+
+            # Search in text files content only (done after the walk, in parallel)
             if search_query and file_info['type'] == 'text':
-                try:
-                    content = filepath.read_text(encoding='utf-8')
-                    if search_query.lower() not in content.lower():
-                        continue
-                except Exception:
-                    continue
-
-            existing = aggregated.get(base_key)
-            ext = file_info['extension'].lower()
-            is_media = file_info['type'] == 'audio' and ext in media_exts
-            is_text_primary = file_info['type'] == 'text' and ext == 'txt'
-            is_json_meta = ext == 'json'
-
-            if existing is None:
-                # Initialize entry; we'll set primary relpath below
-                entry = dict(file_info)
-                entry['meta_relpath'] = None
-                # Only initialize with non-JSON files as primary
-                if is_media or is_text_primary:
-                    # Primary file - keep as is
-                    pass
-                elif is_json_meta:
-                    # JSON meta as placeholder; primary may be updated later
-                    entry['filename'] = None  # Will be set when primary found
-                    entry['relpath'] = None
-                    entry['extension'] = None
-                    entry['size'] = 0
-                aggregated[base_key] = entry
-                existing = entry
-
-            # Update primary/metadata preferences
-            if file_info['type'] == 'audio':
-                if is_media:
-                    # Prefer media as primary
-                    existing.update({
-                        'filename': file_info['filename'],
-                        'relpath': file_info['relpath'],
-                        'extension': file_info['extension'],
-                        'size': file_info['size'],
-                    })
-                elif is_json_meta:
-                    existing['meta_relpath'] = file_info['relpath']
-            else:  # text
-                if is_text_primary:
-                    # Prefer .txt as primary
-                    existing.update({
-                        'filename': file_info['filename'],
-                        'relpath': file_info['relpath'],
-                        'extension': file_info['extension'],
-                        'size': file_info['size'],
-                    })
-                elif is_json_meta:
-                    existing['meta_relpath'] = file_info['relpath']
-            # (Old list-based accumulation removed; aggregation is used instead)
+                pending.append((base_key, file_info, entry))
+                continue
+            add(base_key, file_info)
+
+        if pending:
+            entries = [entry for _, _, entry in pending]
+            with ThreadPoolExecutor(max_workers=min(SEARCH_WORKERS, len(entries))) as executor:
+                matches = list(executor.map(search_file, entries, [search_needle] * len(entries)))
+            for (base_key, file_info, _), matched in zip(pending, matches):
+                if matched:
+                    add(base_key, file_info)
     except Exception as e:
         print(f"Error scanning files: {e}")
-    # Turn into list and sort by datetime descending
-    files_list = list(aggregated.values())
-    # Drop entries that only have JSON metadata but no primary file, or have None filename
-    files_list = [f for f in files_list if f.get('relpath') and f.get('filename') and f.get('extension', '').lower() != 'json']
-    files_list.sort(key=lambda x: x['datetime'], reverse=True)
-    # Enforce limit
-    return files_list[:limit]
+    # Attach metadata paths; stems that only have a .json sidecar are never listed
+    for base_key, entry in primary.items():
+        entry['meta_relpath'] = meta.get(base_key)
+    # Newest first, limited: O(N log limit), same result as sort(reverse=True)[:limit]
+    return heapq.nlargest(limit, primary.values(), key=itemgetter('datetime'))
+
+def scan_stats() -> Dict:
+    """Walk storage once and compute /api/stats counters without building file dicts.
+
+    Each stem counts once, using the same primary-file preference as scan_files;
+    .json sidecars are ignored.
+    """
+    media_exts = {"ogg", "mp3", "m4a", "wav"}
+    primary: Dict[str, tuple] = {}  # stem -> (stamp, type, DirEntry) of the primary file
+    for entry in iter_files(STORAGE_DIR):
+        match = FILENAME_RE.match(entry.name)
+        if not match:
+            continue
+        msg_type, ext = match.group(4), match.group(5).lower()
+        if ext == 'json':
+            continue
+        base_key = os.path.splitext(entry.name)[0]
+        preferred = ext in media_exts if msg_type == 'audio' else ext == 'txt'
+        if preferred or base_key not in primary:
+            primary[base_key] = (match.group(1), msg_type, entry)
+
+    # Fixed-width YYYYMMDDHHMMSS stamps order like the dates they encode, so
+    # compare them as strings and build datetimes only for the two outputs.
+    # Validity matches parse_stamp: calendar dates are checked once per day
+    # (there are few distinct days), times by a string range check.
+    week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y%m%d%H%M%S')
+    valid_days: Dict[str, bool] = {}
+    text_count = audio_count = total_size = recent_count = 0
+    first_stamp = last_stamp = None
+    for dt_str, msg_type, entry in primary.values():
+        day = dt_str[:8]
+        day_ok = valid_days.get(day)
+        if day_ok is None:
+            day_ok = valid_days[day] = parse_stamp(day + '000000') is not None
+        if not day_ok or dt_str[8:10] > '23' or dt_str[10:12] > '59' or dt_str[12:14] > '59':
+            continue
+        if msg_type == 'text':
+            text_count += 1
+        else:
+            audio_count += 1
+        try:
+            total_size += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+        if dt_str > week_ago:
+            recent_count += 1
+        if first_stamp is None or dt_str < first_stamp:
+            first_stamp = dt_str
+        if last_stamp is None or dt_str > last_stamp:
+            last_stamp = dt_str
+
+    first_dt = parse_stamp(first_stamp) if first_stamp else None
+    last_dt = parse_stamp(last_stamp) if last_stamp else None
+
+    return {
+        'total_files': text_count + audio_count,
+        'text_files': text_count,
+        'audio_files': audio_count,
+        'total_size': total_size,
+        'date_range': {
+            'first': first_dt.strftime('%Y-%m-%d %H:%M:%S') if first_dt else None,
+            'last': last_dt.strftime('%Y-%m-%d %H:%M:%S') if last_dt else None
+        },
+        'recent_activity': recent_count,
+    }
+
+def conditional_json(build, *key):
+    """jsonify(build()) with an ETag/Last-Modified, or an empty 304 if the client is current.
+
+    Both validators change with the storage mtimes the scan cache watches and
+    otherwise roll over every SCAN_CACHE_TTL seconds of wall-clock time
+    (Last-Modified is at least the window start). Changes the mtimes miss, such
+    as time-based values (recent_activity) or edits in older date folders, show
+    up within about one window; the scan cache runs its own monotonic TTL, so
+    the two are not aligned.
+    """
+    tree_mtime = _storage_mtime()
+    window = int(time.time() // SCAN_CACHE_TTL)
+    etag = hashlib.md5(repr((tree_mtime, window) + key).encode()).hexdigest()
+    changed = max(max(tree_mtime, default=0) // 10**9, int(window * SCAN_CACHE_TTL))
+    last_modified = datetime.fromtimestamp(changed, timezone.utc)
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        # JSON mimetype keeps add_no_cache_headers (HTML only) off the 304
+        response = app.response_class(status=304, mimetype='application/json')
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Behind the PIN, and always revalidated so new messages show up
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/')
 def index():
     """Main page with file listing and search."""
-    auth_check = require_auth()
-    if auth_check:
-        return auth_check
     return render_template('index.html')
 
 @app.route('/api/files')
 def api_files():
     """API endpoint to get files with filtering."""
-    auth_check = require_auth()
-    if auth_check:
-        return auth_check
-        
     date_filter = request.args.get('date')
     type_filter = request.args.get('type')
     search_query = request.args.get('search')
     limit = min(int(request.args.get('limit', 100)), 500)
     
-    files = scan_files(date_filter, type_filter, search_query, limit)
-
-    # Convert datetime objects to strings for JSON serialization
-    for file_info in files:
-        # Keep ISO for programmatic use and a pretty string for display
-        dt_obj = file_info.get('datetime')
-        if isinstance(dt_obj, datetime):
-            file_info['datetime'] = dt_obj.isoformat()
-            file_info['datetime_str'] = dt_obj.strftime('%Y-%m-%d %H:%M:%S')
-        # Do not keep raw datetime objects in JSON
-        if isinstance(file_info.get('datetime'), datetime):
-            file_info['datetime'] = file_info['datetime'].isoformat()
-
-    return jsonify({
-        'files': files,
-        'total': len(files)
-    })
+    def build():
+        files = scan_files(date_filter, type_filter, search_query, limit)
+        return {'files': files, 'total': len(files)}
+
+    return conditional_json(build, 'files', date_filter, type_filter, search_query, limit)
+
+def resolve_storage_path(filename: str) -> str:
+    """Resolve a request path inside STORAGE_DIR, aborting with 404 if it escapes.
+
+    Existence isn't checked here: open()/send_file raise FileNotFoundError,
+    which is answered with 404 below, saving a stat per request.
+    """
+    filepath = os.path.realpath(os.path.join(STORAGE_ROOT, filename))
+    if not filepath.startswith(STORAGE_ROOT + os.sep):
+        abort(404)
+    return filepath
+
+@app.errorhandler(FileNotFoundError)
+@app.errorhandler(IsADirectoryError)
+def file_not_found(error):
+    """Missing storage files (or directories requested as files) are plain 404s."""
+    return app.handle_http_exception(NotFound())
 
 @app.route('/api/content/<path:filename>')
 def api_content(filename):
     """Get file content for text-like files by relative path."""
-    auth_check = require_auth()
-    if auth_check:
-        return auth_check
-        
-    filepath = os.path.join(STORAGE_DIR, filename)
-    if not os.path.exists(filepath):
-        abort(404)
+    filepath = resolve_storage_path(filename)
 
     # Basic extension check for text content
     _, ext = os.path.splitext(filepath.lower())
@@ -328,78 +645,78 @@ def api_content(filename):
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
-        return jsonify({'content': content})
+    except FileNotFoundError:
+        abort(404)
     except Exception:
         abort(500)
+    return jsonify({'content': content})
+
+# Content types for the extensions the bot writes; anything else goes through guess_type
+_MIME = {
+    '.txt': 'text/plain',
+    '.json': 'application/json',
+    '.ogg': 'audio/ogg',
+    '.mp3': 'audio/mpeg',
+    '.m4a': 'audio/mp4',
+    '.wav': 'audio/wav',
+}
+
+def guess_mimetype(filepath: str) -> Optional[str]:
+    """Content type for a storage file, from _MIME when the extension is known."""
+    return _MIME.get(os.path.splitext(filepath)[1].lower()) or mimetypes.guess_type(filepath)[0]
+
+def send_storage_file(filepath: str, as_attachment: bool, max_age: Optional[int] = None):
+    """Send a resolved storage file, or hand the transfer to nginx if X_ACCEL_PREFIX is set.
+
+    With X-Accel-Redirect the proxy streams the file itself (sendfile, Range,
+    conditional requests) and no worker thread is tied up for the download.
+    Otherwise send_file's conditional responses serve Range requests and 304s.
+    """
+    mimetype = guess_mimetype(filepath)
+    if not X_ACCEL_PREFIX:
+        return send_file(filepath, as_attachment=as_attachment, mimetype=mimetype,
+                         conditional=True, max_age=max_age)
+
+    relpath = os.path.relpath(filepath, STORAGE_ROOT).replace(os.sep, '/')
+    response = app.response_class(mimetype=mimetype)
+    if mimetype is None:
+        del response.headers['Content-Type']  # let nginx pick it from the extension
+    response.headers['X-Accel-Redirect'] = X_ACCEL_PREFIX.rstrip('/') + '/' + quote(relpath)
+    if as_attachment:
+        response.headers.set('Content-Disposition', 'attachment', filename=os.path.basename(filepath))
+    if max_age is not None:
+        response.cache_control.max_age = max_age
+    return response
 
 @app.route('/api/download/<path:filename>')
 def api_download(filename):
     """Download file by relative path."""
-    auth_check = require_auth()
-    if auth_check:
-        return auth_check
-        
-    filepath = os.path.join(STORAGE_DIR, filename)
-    if not os.path.exists(filepath):
-        abort(404)
-    mimetype = mimetypes.guess_type(filepath)[0]
-    return send_file(filepath, as_attachment=True, mimetype=mimetype)
-
-# Backward/alternate route aliases to match frontend
-@app.route('/api/file/<path:filename>')
-def api_file_alias(filename):
-    auth_check = require_auth()
-    if auth_check:
-        return auth_check
-    return api_content(filename)
-
-@app.route('/download/<path:filename>')
-def download_alias(filename):
-    auth_check = require_auth()
-    if auth_check:
-        return auth_check
-    return api_download(filename)
+    filepath = resolve_storage_path(filename)
+    return send_storage_file(filepath, as_attachment=True)
+
+# Backward/alternate route aliases to match frontend: same views, no extra dispatch
+app.add_url_rule('/api/file/<path:filename>', view_func=api_content)
+app.add_url_rule('/download/<path:filename>', view_func=api_download)
+
+# Browser cache lifetime for /media responses (seconds)
+MEDIA_MAX_AGE = 24 * 3600
 
 # Inline media streaming (useful for audio preview)
 @app.route('/media/<path:filename>')
 def media_stream(filename):
-    auth_check = require_auth()
-    if auth_check:
-        return auth_check
-        
-    filepath = os.path.join(STORAGE_DIR, filename)
-    if not os.path.exists(filepath):
-        abort(404)
-    mimetype = mimetypes.guess_type(filepath)[0]
-    return send_file(filepath, as_attachment=False, mimetype=mimetype)
+    filepath = resolve_storage_path(filename)
+    # Archived files never change, so the browser may reuse them without asking
+    response = send_storage_file(filepath, as_attachment=False, max_age=MEDIA_MAX_AGE)
+    # send_file marks cacheable responses public; these are behind the PIN
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
 
 @app.route('/api/stats')
 def api_stats():
     """Get storage statistics."""
-    auth_check = require_auth()
-    if auth_check:
-        return auth_check
-        
     try:
-        files = scan_files(limit=10000)  # Get more files for stats
-
-        stats = {
-            'total_files': len(files),
-            'text_files': len([f for f in files if f['type'] == 'text']),
-            'audio_files': len([f for f in files if f['type'] == 'audio']),
-            'total_size': sum(f['size'] for f in files),
-            'date_range': {
-                'first': files[-1]['datetime'].strftime('%Y-%m-%d %H:%M:%S') if files else None,
-                'last': files[0]['datetime'].strftime('%Y-%m-%d %H:%M:%S') if files else None
-            }
-        }
-        
-        # Recent activity (last 7 days)
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_files = [f for f in files if f['datetime'] > week_ago]
-        stats['recent_activity'] = len(recent_files)
-        
-        return jsonify(stats)
+        return conditional_json(scan_stats, 'stats')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500